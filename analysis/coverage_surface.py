@@ -0,0 +1,62 @@
+from typing import Tuple
+
+import numpy as np
+
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix_chunks
+from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.confidence_interval import BaseConfidenceIntervalCalculator, ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_method
+from coverage_probability.coverage_probability import coverage_probabilities
+
+
+def coverage_surface(
+        N: int,
+        K: int,
+        confidence_interval_function: BaseConfidenceIntervalCalculator
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the coverage probability of every unfiltered candidate of (N, K, confidence interval function), under
+    the multinomial method of the calculator (see multinomial_method).
+
+    Conditions only select subsets of these candidates, so any number of them can then be answered from one surface
+    with a boolean mask (see masked_minimizer). The surface is not cached: callers build it once for the conditions
+    they answer and drop it afterwards, since it holds every candidate and a calculator's endpoints change with its
+    alpha.
+
+    Parameters:
+        N (int): Number of trials.
+        K (int): Number of categories.
+        confidence_interval_function (BaseConfidenceIntervalCalculator): Calculator whose endpoints define the grid.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (M, K-1) candidates, in generation order, and their (M,) coverage values.
+    """
+    ranked_endpoints = rank_endpoints(N, confidence_interval_function)
+    chunks = list(generate_unique_matrix_chunks(K - 1, ranked_endpoints))
+    candidates = np.concatenate(chunks) if chunks else np.empty((0, K - 1))
+    coverage = coverage_probabilities(N, candidates, multinomial_method(confidence_interval_function, K))
+
+    candidates.flags.writeable = False
+    coverage.flags.writeable = False
+    return candidates, coverage
+
+
+def masked_minimizer(candidates: np.ndarray, coverage: np.ndarray, mask: np.ndarray) -> Tuple[float, list]:
+    """
+    Returns the (min_value, minimizer) pair of find_minimizer restricted to the candidates selected by the mask.
+
+    Ties go to the first selected candidate, and an empty selection gives (inf, []).
+    """
+    selected = np.flatnonzero(mask)
+    if len(selected) == 0:
+        return float('inf'), []
+
+    index = selected[np.argmin(coverage[selected])]
+    return float(coverage[index]), candidates[index].tolist()
+
+
+if __name__ == '__main__':
+    # Example usage
+    candidates_, coverage_ = coverage_surface(30, 3, ConfidenceIntervalCalculator())
+    print(masked_minimizer(candidates_, coverage_, np.ones(len(candidates_), dtype=bool)))
+    print(masked_minimizer(candidates_, coverage_, candidates_.max(axis=1) > 0.5))
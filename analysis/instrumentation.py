@@ -0,0 +1,112 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_kb() -> int | None:
+    """Returns the peak resident set size of the process so far, in kilobytes, or None when it cannot be read."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class StageRecorder:
+    """
+    Collects per-stage wall time, memory and counters for one run.
+
+    Stages may nest: the wall time of a stage excludes the time spent in the stages opened inside it, so the stages
+    of a streamed pipeline (generation pulled by filtering pulled by minimisation) are each charged their own share.
+
+    The operating system only reports the high-water mark of the whole process, so each stage records two numbers:
+    process_peak_rss_kb, that mark when the stage last exited, and peak_rss_increase_kb, the largest rise of the mark
+    during one run of the stage. The increase is the memory the stage needed beyond the earlier peak; it is 0 for a
+    stage that stayed under a peak set before it.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float | int | None]] = {}
+        self._child_times = []
+
+    def _stage(self, name: str) -> Dict[str, float | int | None]:
+        return self.stages.setdefault(name, {"wall_time": 0., "process_peak_rss_kb": None,
+                                             "peak_rss_increase_kb": None})
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        start_rss = peak_rss_kb()
+        self._child_times.append(0.)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            child_time = self._child_times.pop()
+            if self._child_times:
+                self._child_times[-1] += elapsed
+
+            stage = self._stage(name)
+            stage["wall_time"] += elapsed - child_time
+            stage["process_peak_rss_kb"] = peak_rss_kb()
+            if start_rss is not None:
+                increase = stage["process_peak_rss_kb"] - start_rss
+                stage["peak_rss_increase_kb"] = max(stage["peak_rss_increase_kb"] or 0, increase)
+
+    def count(self, name: str, counter: str, value: int) -> None:
+        """Adds value to a counter of the stage."""
+        stage = self._stage(name)
+        stage[counter] = stage.get(counter, 0) + value
+
+    def chunks(self, name: str, chunks: Iterable[np.ndarray], counter: str) -> Iterator[np.ndarray]:
+        """Passes the chunks through, charging the time taken to produce each one to the stage and counting rows."""
+        iterator = iter(chunks)
+        while True:
+            with self.stage(name):
+                chunk = next(iterator, None)
+                if chunk is not None:
+                    self.count(name, counter, len(chunk))
+            if chunk is None:
+                return
+            yield chunk
+
+    def as_dict(self) -> Dict[str, Dict[str, float | int | None]]:
+        return {name: dict(stage) for name, stage in self.stages.items()}
+
+    def write_trace(self, trace_path: str, **metadata) -> None:
+        """Appends the stages, with the metadata identifying the run, as one JSON line to the trace file."""
+        with open(trace_path, 'a') as file:
+            file.write(json.dumps({**metadata, "stages": self.as_dict()}) + "\n")
+
+
+class NullRecorder(StageRecorder):
+    """A recorder that records nothing, used when instrumentation is disabled."""
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        yield
+
+    def count(self, name: str, counter: str, value: int) -> None:
+        pass
+
+    def chunks(self, name: str, chunks: Iterable[np.ndarray], counter: str) -> Iterable[np.ndarray]:
+        return chunks
+
+    def write_trace(self, trace_path: str, **metadata) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    # Example usage
+    recorder = StageRecorder()
+    generated = recorder.chunks("generation", (np.zeros((100, 2)) for _ in range(5)), "candidates_generated")
+    kept = recorder.chunks("filtering", (chunk[:10] for chunk in generated), "candidates_kept")
+    with recorder.stage("minimization"):
+        total = sum(len(chunk) for chunk in kept)
+    print(total, json.dumps(recorder.as_dict(), indent=2))
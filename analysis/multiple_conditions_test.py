@@ -1,8 +1,9 @@
 from typing import List, Callable
 
 from analysis.tsv_analysis import tsv_analysis_multiple
-from conditions.conditions import entropy_lower_than_uniform
+from conditions.conditions import entropy_lower_than_uniform_batch
 from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator
+from final.filter_probability_vectors import vectorized_condition
 
 if __name__ == '__main__':
     file_path = 'analysis_results.tsv'
@@ -14,9 +15,10 @@ if __name__ == '__main__':
 
     thresholds = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
     for th in thresholds:
-        condition = lambda v: entropy_lower_than_uniform(v, threshold=th)
-        condition.__name__ = f'EntropyThreshold={th}'  # Name the lambda for file recording
+        # Named for file recording
+        condition = vectorized_condition(entropy_lower_than_uniform_batch, name=f'EntropyThreshold={th}', threshold=th)
         conditions.append(condition)
 
     # Execute analysis for each condition
-    tsv_analysis_multiple(N_values, K_values, file_path, confidence_interval_functions, conditions, debug=True)
+    tsv_analysis_multiple(N_values, K_values, file_path, confidence_interval_functions, conditions, debug=True,
+                          shared_coverage=True)
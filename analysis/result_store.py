@@ -0,0 +1,184 @@
+import csv
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from typing import List
+
+TSV_HEADER = [
+    "N", "K", "Confidence Interval Function", "Confidence Interval Function Alpha", "Condition", "Filtering",
+    "Minimum Value", "Minimizer", "Risk", "Elapsed Time", "Certified Error"
+]
+
+# Header of the files written before the Certified Error column was added
+LEGACY_TSV_HEADER = TSV_HEADER[:-1]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    n INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    confidence_interval_function TEXT NOT NULL,
+    alpha REAL NOT NULL,
+    condition TEXT NOT NULL,
+    filtering TEXT NOT NULL,
+    minimum_value REAL,
+    minimizer TEXT,
+    risk REAL,
+    elapsed_time REAL,
+    certified_error REAL,
+    PRIMARY KEY (n, k, confidence_interval_function, alpha, condition)
+)
+"""
+
+
+def format_certified_error(certified_error: float | None) -> str:
+    """Formats the optional Certified Error column: empty when the minimum value was not certified."""
+    return '' if certified_error is None else str(certified_error)
+
+
+def upgrade_tsv_header(file_path: str) -> None:
+    """
+    Adds an empty Certified Error column to a results TSV file written with LEGACY_TSV_HEADER, so that rows of the
+    current format can be appended to it. The file is replaced atomically, and left alone if it is already current.
+    """
+    if not os.path.exists(file_path):
+        return
+    with open(file_path, 'r') as file:
+        header = file.readline().rstrip("\n").split("\t")
+        if header != LEGACY_TSV_HEADER:
+            return
+        lines = [line.rstrip("\n") for line in file]
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.upgrade-', suffix='.tsv')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            file.write("\t".join(TSV_HEADER) + "\n")
+            for line in lines:
+                if line:
+                    file.write(line + "\t\n")
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class ResultStore:
+    def __init__(self, db_path: str, timeout: float = 60.):
+        """
+        SQLite-backed store of analysis results, keyed on (N, K, confidence interval function, alpha, condition).
+
+        Lookups go through the primary-key index instead of scanning a TSV file, and inserts run in their own
+        transaction, so several processes can share the same database. Every operation opens its own connection,
+        which keeps the store safe to use from forked worker processes.
+
+        Parameters:
+            db_path (str): Path to the SQLite database, created if it does not exist.
+            timeout (float): Seconds to wait for a lock held by another process.
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.execute(_SCHEMA)
+                columns = [row[1] for row in connection.execute("PRAGMA table_info(results)")]
+                if "certified_error" not in columns:
+                    # Databases created before the column was added
+                    connection.execute("ALTER TABLE results ADD COLUMN certified_error REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+
+    def exists(self, N: int, K: int, confidence_interval_function_name: str, alpha: float,
+               condition_name: str) -> bool:
+        """Checks if an entry with the specified parameters already exists."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT 1 FROM results WHERE n = ? AND k = ? AND confidence_interval_function = ? AND alpha = ? "
+                "AND condition = ?",
+                (N, K, confidence_interval_function_name, alpha, condition_name)
+            ).fetchone()
+        return row is not None
+
+    def insert(self, N: int, K: int, confidence_interval_function_name: str, alpha: float, condition_name: str,
+               filtering_status: str, min_value: float, minimizer: List[float], risk: float,
+               elapsed_time: float, certified_error: float = None) -> bool:
+        """
+        Inserts a result row in a single transaction. certified_error is the certified bound on the error of min_value,
+        or None when it was not certified.
+
+        Returns:
+            bool: True if the row was inserted, False if another process already stored the same key.
+        """
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO results (n, k, confidence_interval_function, alpha, condition, filtering, "
+                    "minimum_value, minimizer, risk, elapsed_time, certified_error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (N, K, confidence_interval_function_name, alpha, condition_name, filtering_status, min_value,
+                     str(minimizer), risk, elapsed_time, certified_error)
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def import_tsv(self, file_path: str) -> int:
+        """
+        Imports the rows of a results TSV file written by tsv_analysis, skipping keys already stored. Files without the
+        Certified Error column are read as uncertified.
+
+        Returns:
+            int: Number of rows inserted.
+        """
+        inserted = 0
+        with open(file_path, 'r', newline='') as file:
+            for row in csv.DictReader(file, delimiter='\t'):
+                inserted += self.insert(
+                    int(row["N"]), int(row["K"]), row["Confidence Interval Function"],
+                    float(row["Confidence Interval Function Alpha"]), row["Condition"] or '', row["Filtering"],
+                    float(row["Minimum Value"]), row["Minimizer"], float(row["Risk"]), float(row["Elapsed Time"]),
+                    float(row["Certified Error"]) if row.get("Certified Error") else None
+                )
+        return inserted
+
+    def export_tsv(self, file_path: str) -> None:
+        """
+        Writes every stored row, in insertion order, to a TSV file readable by tsv_plot.plot_risks_vs_N.
+
+        An existing file is first merged into the store with import_tsv, so its rows are kept, and the file is then
+        replaced atomically: a results file is never truncated before the store holds all of its rows.
+        """
+        if os.path.exists(file_path):
+            self.import_tsv(file_path)
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT n, k, confidence_interval_function, alpha, condition, filtering, minimum_value, minimizer, "
+                "risk, elapsed_time, certified_error FROM results ORDER BY rowid"
+            ).fetchall()
+
+        directory = os.path.dirname(os.path.abspath(file_path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.export-', suffix='.tsv')
+        try:
+            with os.fdopen(descriptor, 'w') as file:
+                file.write("\t".join(TSV_HEADER) + "\n")
+                for row in rows:
+                    file.write("\t".join([str(value) for value in row[:-1]] + [format_certified_error(row[-1])])
+                               + "\n")
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+
+if __name__ == '__main__':
+    # Example usage
+    store = ResultStore('analysis_results.sqlite')
+    store.insert(20, 3, "Fitzpatrick_and_Scott", 0.05, "Threshold=0.9", "True", 0.93, [0.4, 0.4, 0.2], 0.07, 1.2)
+    print(store.exists(20, 3, "Fitzpatrick_and_Scott", 0.05, "Threshold=0.9"))
+    store.export_tsv('analysis_results_export.tsv')
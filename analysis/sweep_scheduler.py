@@ -0,0 +1,313 @@
+import math
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from analysis.result_store import ResultStore, TSV_HEADER, upgrade_tsv_header
+from analysis.tsv_analysis import check_existing_entry, record_result
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix_chunks
+from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.chi_square_confidence_intervals import GoodmanConfidenceIntervalCalculator
+from confidence_intervals.confidence_interval import BaseConfidenceIntervalCalculator, ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_method
+from coverage_probability.coverage_probability import coverage_probabilities
+from final.filter_probability_vectors import condition_mask, filter_probability_vector_batch, vectorized_condition
+from final.transform_to_probability_vector import transform_to_probability_matrix
+from weighted_simplex.find_minimizer import weight_vector
+
+
+def estimated_cost(N: int, K: int, n_endpoints: int) -> int:
+    """
+    Estimates the work of one (N, K, confidence interval function) task as the number of candidates times the number
+    of outcomes, C(E + K - 2, K - 1) * C(N + K - 1, K - 1) for E ranked endpoints. The candidate count is an upper
+    bound, since candidates summing to more than 1 are never generated, but it orders tasks correctly.
+    """
+    return math.comb(n_endpoints + K - 2, K - 1) * math.comb(N + K - 1, K - 1)
+
+
+def _picklable(selector: Callable) -> bool:
+    """Tells whether a condition or weight function can be sent to a worker process."""
+    try:
+        pickle.dumps(selector)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _answer_chunks(
+        chunk_source: Callable[[], Iterable[np.ndarray]],
+        coverage: np.ndarray,
+        selectors: List[Tuple[Callable, bool]]
+) -> Tuple[List[Tuple[str, float, List[float], float]], float]:
+    """
+    Answers conditions and weight functions from the coverage of a task's unfiltered candidates, which chunk_source
+    produces again chunk by chunk in the order of coverage, so that the candidates are never all held at once.
+
+    A condition is answered with a running masked argmin, ties going to the first candidate as in masked_minimizer. A
+    weight function is answered as in find_skewed_average_minimizer_chunks: its weighted sums are accumulated chunk by
+    chunk, and the candidate closest to the skewed average is fetched with one more pass over the chunks.
+
+    Returns:
+        Tuple[List[Tuple[str, float, List[float], float]], float]: The filtering status, minimum value, minimizer and
+        answering time of each selector, and the time spent producing the chunks, shared by all of them.
+    """
+    answers = [['Weighted' if weighted else 'True' if selector else 'False', float('inf'), [], 0.]
+               for selector, weighted in selectors]
+    weighted_sums = {i: [0., 0.] for i, (_, weighted) in enumerate(selectors) if weighted}
+    nonzero = {i: [] for i in weighted_sums}
+    total_start_time = time.time()
+
+    offset = 0
+    for chunk in chunk_source():
+        chunk_coverage = coverage[offset:offset + len(chunk)]
+        offset += len(chunk)
+        prob_matrix = transform_to_probability_matrix(chunk)
+
+        for i, (selector, weighted) in enumerate(selectors):
+            start_time = time.time()
+            if weighted:
+                weights = weight_vector(prob_matrix, selector)
+                weighted_sums[i][0] += float(chunk_coverage @ weights)
+                weighted_sums[i][1] += float(weights.sum())
+                nonzero[i].append(weights != 0)
+            else:
+                selected = np.flatnonzero(condition_mask(prob_matrix, selector)) if selector else np.arange(len(chunk))
+                if len(selected):
+                    index = selected[int(np.argmin(chunk_coverage[selected]))]
+                    if chunk_coverage[index] < answers[i][1]:
+                        answers[i][1], answers[i][2] = float(chunk_coverage[index]), chunk[index].tolist()
+            answers[i][3] += time.time() - start_time
+
+    closest = {}
+    for i, (total_weighted_cov_prob, total_weight) in weighted_sums.items():
+        if offset == 0:
+            continue
+        start_time = time.time()
+        answers[i][1] = total_weighted_cov_prob / total_weight if total_weight != 0 else float('inf')
+        distance = np.where(np.concatenate(nonzero[i]), np.abs(coverage - answers[i][1]), np.inf)
+        if distance.min() < float('inf'):
+            closest[i] = int(np.argmin(distance))
+        answers[i][3] += time.time() - start_time
+
+    if closest:
+        # Produce the chunks again to fetch the candidates closest to the skewed averages
+        offset = 0
+        for chunk in chunk_source():
+            for i, index in closest.items():
+                if offset <= index < offset + len(chunk):
+                    answers[i][2] = chunk[index - offset].tolist()
+            offset += len(chunk)
+
+    shared_time = time.time() - total_start_time - sum(answer[3] for answer in answers)
+    return [tuple(answer) for answer in answers], shared_time
+
+
+def _surface_task(
+        N: int,
+        K: int,
+        confidence_interval_function: BaseConfidenceIntervalCalculator,
+        ranked_endpoints: List[float],
+        selectors: List[Tuple[Callable, bool]],
+        keep_coverage: bool
+) -> Tuple[np.ndarray | None, List[Tuple[str, float, List[float], float]], float]:
+    """
+    Worker entry point: evaluates the coverage of a task's candidates chunk by chunk, keeping the coverage values but
+    not the candidates, and answers the selectors it was given, which must be picklable (see _answer_chunks).
+
+    Returns:
+        Tuple[np.ndarray | None, List, float]: The coverage values, only with keep_coverage, for the selectors answered
+        in the parent process; the answers of the selectors; and the time spent on the shared work.
+    """
+    start_time = time.time()
+    chunk_source = partial(generate_unique_matrix_chunks, K - 1, ranked_endpoints)
+    multinomial_confidence_interval = multinomial_method(confidence_interval_function, K)
+    coverage = np.concatenate([coverage_probabilities(N, chunk, multinomial_confidence_interval)
+                               for chunk in chunk_source()] or [np.empty(0)])
+    surface_time = time.time() - start_time
+
+    answers, shared_time = _answer_chunks(chunk_source, coverage, selectors)
+    return (coverage if keep_coverage else None), answers, surface_time + shared_time
+
+
+def sweep_tasks(
+        N_values: List[int],
+        K_values: List[int],
+        file_path: str,
+        confidence_interval_function_values: List[BaseConfidenceIntervalCalculator],
+        selectors: List[Tuple[Callable, bool]],
+        result_store: ResultStore = None
+) -> List[Dict]:
+    """
+    Builds the task graph of a sweep: one task per (N, K, confidence interval function) that still has rows to
+    compute, holding the (selector, weighted) pairs it has to answer.
+
+    rank_endpoints, the only stage shared across K, is run here once per (N, confidence interval function), and its
+    output is handed to every task of that pair. Calculators built for a number of categories k only get tasks with
+    K = k, as in tsv_analysis_multiple.
+
+    Returns:
+        List[Dict]: The tasks, largest estimated cost first.
+    """
+    tasks = []
+    for N in N_values:
+        for confidence_interval_function in confidence_interval_function_values:
+            name = confidence_interval_function.__name__
+            alpha = confidence_interval_function.alpha
+            ranked_endpoints = None
+
+            for K in K_values:
+                if getattr(confidence_interval_function, 'k', K) != K:
+                    continue  # Calculators of simultaneous methods are built for a single number of categories
+
+                pending = []
+                for selector, weighted in selectors:
+                    selector_name = selector.__name__ if selector else ''
+                    if result_store is not None:
+                        exists = result_store.exists(N, K, name, alpha, selector_name)
+                    else:
+                        exists = check_existing_entry(file_path, N, K, name, alpha, selector_name)
+                    if exists:
+                        print(
+                            f"Entry for N={N}, K={K}, confidence_interval_function={name}, alpha={alpha}, condition={selector_name} already exists. Skipping computation."
+                        )
+                        continue
+                    pending.append((selector, weighted))
+
+                if not pending:
+                    continue
+                if ranked_endpoints is None:
+                    ranked_endpoints = rank_endpoints(N, confidence_interval_function)
+                tasks.append({
+                    "N": N, "K": K, "confidence_interval_function": confidence_interval_function,
+                    "ranked_endpoints": ranked_endpoints, "selectors": pending,
+                    "cost": estimated_cost(N, K, len(ranked_endpoints))
+                })
+
+    # Largest first, so that the longest task does not start last and leave the other workers idle
+    tasks.sort(key=lambda task: task["cost"], reverse=True)
+    return tasks
+
+
+def run_sweep(
+        N_values: List[int],
+        K_values: List[int],
+        file_path: str,
+        confidence_interval_function_values: List[BaseConfidenceIntervalCalculator],
+        conditions: List[Callable[[List[float]], bool]] = None,
+        weight_functions: List[Callable[[np.ndarray], float]] = None,
+        max_workers: int | None = None,
+        debug: bool = False,
+        result_store: ResultStore = None
+) -> List[float]:
+    """
+    Runs a whole sweep, N values x K values x confidence interval functions x (conditions and weight functions), on a
+    process pool, writing the same rows as tsv_analysis_multiple and weighted_simplex.analysis.tsv_analysis_multiple.
+
+    Every shared stage is computed once: rank_endpoints per (N, confidence interval function), and the coverage of the
+    candidates per (N, K, confidence interval function), which a worker evaluates chunk by chunk without ever holding
+    every candidate. Conditions and weight functions that can be pickled are answered by the worker from that
+    coverage (see _answer_chunks), which only sends back their answers. The others are answered in this process, from
+    the coverage values the worker then also returns (8 bytes per candidate) and the candidates generated again chunk
+    by chunk, so they do not need to be picklable; the calculators do. Candidates are never sent between processes.
+    The tasks are run largest estimated cost first (see estimated_cost), and the rows of each task are written as soon
+    as it completes, so an interrupted sweep keeps every finished task and skips it when rerun.
+
+    The elapsed time of a row is the time spent answering it, plus, for the first row of a task, the time spent on
+    the work shared by its rows: evaluating the coverage and producing the candidate chunks.
+
+    Parameters:
+        N_values (List[int]): Numbers of trials.
+        K_values (List[int]): Numbers of categories.
+        file_path (str): TSV file the rows are appended to, or exported to at the end when result_store is given.
+        confidence_interval_function_values (List[BaseConfidenceIntervalCalculator]): Calculators; must be picklable.
+        conditions (List[Callable[[List[float]], bool]]): Candidate filters; None is the unfiltered row.
+        weight_functions (List[Callable[[np.ndarray], float]]): Weight functions of the weighted analysis.
+        max_workers (int | None): Number of worker processes; None uses every core and 1 runs in-process.
+        debug (bool): Print progress.
+        result_store (ResultStore): Optional result store, written to instead of the TSV file.
+
+    Returns:
+        List[float]: Risks of the rows that were not already recorded, in completion order.
+    """
+    # Check if file exists and write headers if it doesn't
+    if result_store is None and not os.path.exists(file_path):
+        if debug:
+            print(f"{file_path} does not exist. Creating file and adding headers.")
+        with open(file_path, 'w') as f:
+            f.write("\t".join(TSV_HEADER) + "\n")
+    elif result_store is None:
+        # Rows are appended in the current format, so a legacy file gets its Certified Error column once, up front
+        upgrade_tsv_header(file_path)
+    elif os.path.exists(file_path):
+        # Rows already in the TSV file are skipped, and kept by the final export
+        result_store.import_tsv(file_path)
+
+    selectors = [(condition, False) for condition in conditions or []]
+    selectors += [(weight_function, True) for weight_function in weight_functions or []]
+    tasks = sweep_tasks(N_values, K_values, file_path, confidence_interval_function_values, selectors, result_store)
+    if debug:
+        print(f"{len(tasks)} task(s) scheduled, {sum(len(task['selectors']) for task in tasks)} row(s) to compute")
+
+    risks = []
+
+    def record(task: Dict, coverage: np.ndarray | None, remote_answers: List, task_time: float) -> None:
+        N, K = task["N"], task["K"]
+        confidence_interval_function = task["confidence_interval_function"]
+        selectors = task["selectors"]
+
+        answers = dict(zip(task["remote"], remote_answers))
+        local = [i for i in range(len(selectors)) if i not in answers]
+        if local:
+            chunk_source = partial(generate_unique_matrix_chunks, K - 1, task["ranked_endpoints"])
+            local_answers, shared_time = _answer_chunks(chunk_source, coverage, [selectors[i] for i in local])
+            answers.update(zip(local, local_answers))
+            task_time += shared_time
+
+        for i, (selector, _) in enumerate(selectors):
+            filtering_status, min_value, minimizer, answer_time = answers[i]
+            elapsed_time = answer_time + task_time
+            task_time = 0.
+
+            if debug:
+                print(f"N={N}, K={K}, {confidence_interval_function.__name__}, "
+                      f"{selector.__name__ if selector else ''}: minimum value = {min_value}")
+            risks.append(record_result(file_path, N, K, confidence_interval_function.__name__,
+                                       confidence_interval_function.alpha, selector.__name__ if selector else '',
+                                       filtering_status, min_value, minimizer, elapsed_time, debug, result_store))
+
+    def submit(task: Dict, run: Callable) -> object:
+        # In-process nothing is pickled, so _surface_task answers every selector; on a pool only the picklable ones
+        task["remote"] = [i for i, (selector, _) in enumerate(task["selectors"])
+                          if max_workers == 1 or _picklable(selector)]
+        return run(_surface_task, task["N"], task["K"], task["confidence_interval_function"],
+                   task["ranked_endpoints"], [task["selectors"][i] for i in task["remote"]],
+                   len(task["remote"]) < len(task["selectors"]))
+
+    if max_workers == 1:
+        for task in tasks:
+            record(task, *submit(task, lambda function, *args: function(*args)))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {submit(task, executor.submit): task for task in tasks}
+            # Stream: record the rows of each task as soon as it completes, not once the whole sweep is done
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(futures.pop(future), *future.result())
+
+    if result_store is not None:
+        result_store.export_tsv(file_path)
+    return risks
+
+
+if __name__ == '__main__':
+    # Example usage
+    conditions_ = [None, vectorized_condition(filter_probability_vector_batch, name='Threshold=0.9', threshold=0.9)]
+    run_sweep([50, 100], [3], 'sweep_results.tsv', [ConfidenceIntervalCalculator(),
+                                                    GoodmanConfidenceIntervalCalculator(3)],
+              conditions_, [lambda vector: 1.], max_workers=2, debug=True)
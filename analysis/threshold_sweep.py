@@ -0,0 +1,60 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+def threshold_sweep(
+        coverage: np.ndarray,
+        features: np.ndarray,
+        thresholds: List[float],
+        strict: bool = False
+) -> List[Tuple[float, int]]:
+    """
+    Answers a whole family of monotone threshold conditions from one pass over the candidates.
+
+    The condition of threshold th keeps the candidates whose feature is >= th (or > th when strict), so raising the
+    threshold only removes candidates. After sorting the candidates by decreasing feature, the kept set of every
+    threshold is a prefix of that order, and its minimum is read from a running minimum over the prefix. Ties in
+    coverage go to the first candidate, as in find_minimizer.
+
+    Parameters:
+        coverage (np.ndarray): Coverage probability of each candidate.
+        features (np.ndarray): Feature value of each candidate.
+        thresholds (List[float]): Thresholds to answer, in any order.
+        strict (bool): Keep features strictly above the threshold instead of at or above it.
+
+    Returns:
+        List[Tuple[float, int]]: For each threshold, the minimum coverage and the index of the minimizer, or
+        (inf, -1) when no candidate is kept.
+    """
+    coverage = np.asarray(coverage, dtype=np.float64)
+    features = np.asarray(features, dtype=np.float64)
+    m = len(coverage)
+
+    # Rank the candidates by (coverage, index) so that a minimum over ranks also settles ties
+    by_coverage = np.lexsort((np.arange(m), coverage))
+    ranks = np.empty(m, dtype=np.int64)
+    ranks[by_coverage] = np.arange(m)
+
+    by_feature = np.argsort(-features, kind='stable')
+    best_rank_in_prefix = np.minimum.accumulate(ranks[by_feature]) if m else ranks
+    sorted_features = features[by_feature][::-1]
+
+    results = []
+    for threshold in thresholds:
+        kept = m - np.searchsorted(sorted_features, threshold, side='right' if strict else 'left')
+        if kept == 0:
+            results.append((float('inf'), -1))
+            continue
+
+        index = int(by_coverage[best_rank_in_prefix[kept - 1]])
+        results.append((float(coverage[index]), index))
+
+    return results
+
+
+if __name__ == '__main__':
+    # Example usage
+    coverage_ = np.array([0.95, 0.93, 0.97, 0.92, 0.96])
+    features_ = np.array([0.1, 0.5, 0.9, 0.2, 0.7])
+    print(threshold_sweep(coverage_, features_, [0., 0.3, 0.6, 0.8, 1.]))
@@ -2,14 +2,29 @@ import os
 import time
 from typing import Callable, List
 
-from candidate_minimizers.generate_unique_matrix import generate_unique_matrix
+import numpy as np
+
+from analysis.coverage_surface import coverage_surface, masked_minimizer
+from analysis.instrumentation import NullRecorder, StageRecorder
+from analysis.result_store import ResultStore, TSV_HEADER, format_certified_error, upgrade_tsv_header
+from analysis.threshold_sweep import threshold_sweep
+from candidate_minimizers.generate_unique_matrix import DEFAULT_CHUNK_SIZE, generate_unique_matrix_chunks
 from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.chi_square_confidence_intervals import GoodmanConfidenceIntervalCalculator
 from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator, BaseConfidenceIntervalCalculator
-from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from confidence_intervals.multinomial_confidence_intervals import multinomial_method
+from coverage_probability.coverage_probability import count_work
 from final.filter_candidates import filter_candidates
-from final.filter_probability_vectors import filter_probability_vector
-from final.transform_to_probability_vector import transform_to_probability_vector
-from find_minimizer.find_minimizer import find_minimizer
+from final.filter_probability_vectors import condition_mask, filter_probability_vector_batch, vectorized_condition
+from final.transform_to_probability_vector import transform_to_probability_matrix, transform_to_probability_vector
+from find_minimizer.adaptive_search import DEFAULT_N_BASINS, DEFAULT_REFINEMENT_FACTOR, adaptive_condition_name, \
+    find_minimizer_adaptive
+from find_minimizer.certified_minimizer import find_minimizer_certified_chunks
+from find_minimizer.checkpoint import find_minimizer_resumable, load_checkpoint, row_checkpoint_path, \
+    skip_completed_chunks
+from find_minimizer.early_exit import find_minimizer_early_exit_chunks
+from find_minimizer.find_minimizer import find_minimizer_chunks
+from find_minimizer.sweep import sweep_minimizers
 
 
 def check_existing_entry(
@@ -38,7 +53,8 @@ def check_existing_entry(
 
     with open(file_path, 'r') as file:
         for line in file:
-            if line.startswith(f"{N}\t{K}\t{confidence_interval_function_name}\t{alpha}\t{condition_name}"):
+            # The trailing tab keeps a condition from matching the longer names it prefixes, such as its adaptive rows
+            if line.startswith(f"{N}\t{K}\t{confidence_interval_function_name}\t{alpha}\t{condition_name}\t"):
                 return True
 
     return False
@@ -51,11 +67,52 @@ def tsv_analysis(
         confidence_interval_function: BaseConfidenceIntervalCalculator,
         condition: Callable[[List[float]], bool] = None,
         alpha: float = 0.05,
-        debug: bool = False
+        debug: bool = False,
+        result_store: ResultStore = None,
+        trace_path: str = None,
+        certify: bool = False,
+        adaptive: bool = False,
+        refinement_factor: int = DEFAULT_REFINEMENT_FACTOR,
+        n_basins: int = DEFAULT_N_BASINS,
+        early_exit: bool = False,
+        checkpoint_path: str = None
 ) -> float | None:
+    """
+    Finds the minimum coverage probability for (N, K) and records it.
+
+    The candidates are built from the endpoints of confidence_interval_function, and their coverage is that of its
+    multinomial method (see multinomial_method): Fitzpatrick and Scott for ConfidenceIntervalCalculator, or Goodman,
+    Quesenberry and Hurst or Sison and Glaz for their calculators.
+
+    With trace_path, the wall time and peak RSS of each stage (endpoint ranking, candidate generation, filtering and
+    minimisation) and its counters (candidates generated and kept, and the outcomes enumerated and pmf evaluations
+    counted by the coverage engines, see count_work) are appended to that file as one JSON line per recorded row.
+
+    With certify, the minimum is found by find_minimizer_certified_chunks, and the certified bound on the error of the
+    Minimum Value is recorded with it, in the Certified Error column of the row (see record_result), as well as in the
+    trace.
+
+    With adaptive, the candidates are searched coarse to fine by find_minimizer_adaptive with the given refinement
+    factor and number of basins, which scales to N in the thousands but only guarantees an upper bound on the minimum.
+    The row is therefore recorded under adaptive_condition_name(condition name), never under the key of the exact
+    minimum, and an exact run of the same condition is not skipped because of it.
+
+    With early_exit, candidates are abandoned as soon as they cannot beat the incumbent (see
+    find_minimizer_early_exit_chunks), and the fraction of the outcome space skipped is written to the trace.
+
+    With checkpoint_path, the incumbent, the completed chunks and the elapsed time are saved to that file after every
+    chunk (see find_minimizer_resumable). A rerun after pre-emption resumes from it without filtering or evaluating
+    the completed chunks again, records the elapsed time of every run, and removes the file once the row is recorded.
+    """
+    if certify + adaptive + early_exit + bool(checkpoint_path) > 1:
+        raise ValueError("Only one of the certified, adaptive, early-exit and checkpointed searches can be used at a "
+                         "time.")
+
     confidence_interval_function_name = confidence_interval_function.__name__
     confidence_interval_function_alpha = confidence_interval_function.alpha
     condition_name = condition.__name__ if condition else ''
+    if adaptive:
+        condition_name = adaptive_condition_name(condition_name)
 
     if debug:
         print("N =", N)
@@ -64,20 +121,40 @@ def tsv_analysis(
         print("Confidence Interval Function Alpha =", confidence_interval_function_alpha)
         print("Condition =", condition_name)
 
-    if check_existing_entry(file_path, N, K, confidence_interval_function_name, confidence_interval_function_alpha,
-                            condition_name):
+    if result_store is not None:
+        exists = result_store.exists(N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                                     condition_name)
+    else:
+        exists = check_existing_entry(file_path, N, K, confidence_interval_function_name,
+                                      confidence_interval_function_alpha, condition_name)
+
+    if exists:
         print(
             f"Entry for N={N}, K={K}, confidence_interval_function={confidence_interval_function_name}, alpha={alpha}, condition={condition_name} already exists. Skipping computation."
         )
         return None
 
+    multinomial_confidence_interval = multinomial_method(confidence_interval_function, K)
+    recorder = StageRecorder() if trace_path else NullRecorder()
     start_time = time.time()  # Start time measurement
 
-    ranked_endpoints = rank_endpoints(N, confidence_interval_function)
-    candidates = generate_unique_matrix(K - 1, ranked_endpoints)
+    with recorder.stage("rank_endpoints"):
+        ranked_endpoints = rank_endpoints(N, confidence_interval_function)
+        recorder.count("rank_endpoints", "endpoints", len(ranked_endpoints))
+    candidates = generate_unique_matrix_chunks(K - 1, ranked_endpoints, DEFAULT_CHUNK_SIZE)
+    if checkpoint_path:
+        fingerprint = {"N": N, "K": K, "confidence_interval_function": confidence_interval_function_name,
+                       "alpha": confidence_interval_function_alpha, "condition": condition_name,
+                       "chunk_size": DEFAULT_CHUNK_SIZE}
+        checkpoint = load_checkpoint(checkpoint_path, fingerprint)
+        if checkpoint is not None:
+            # Chunks completed before a pre-emption are neither filtered nor evaluated again
+            candidates = skip_completed_chunks(candidates, set(checkpoint["completed"]))
+    candidates = recorder.chunks("generation", candidates, "candidates_generated")
 
     if condition:
-        candidates = filter_candidates(candidates, condition)
+        candidates = recorder.chunks("filtering", (filter_candidates(chunk, condition) for chunk in candidates),
+                                     "candidates_kept")
         filtering_status = 'True'
     else:
         filtering_status = 'False'
@@ -85,21 +162,94 @@ def tsv_analysis(
     if debug:
         print("With Filtering =", filtering_status)
 
-    min_value, minimizer = find_minimizer(N, candidates, multinomial_confidence_intervals)
+    candidates = recorder.chunks("minimization", candidates, "candidates_evaluated")
+    certified_error = None
+    previous_elapsed_time = 0.
+    with recorder.stage("minimization"), count_work() as work:
+        if adaptive:
+            min_value, minimizer, evaluated = find_minimizer_adaptive(
+                N, K, ranked_endpoints, multinomial_confidence_interval, condition, refinement_factor, n_basins
+            )
+            recorder.count("minimization", "candidates_evaluated", evaluated)
+        elif checkpoint_path:
+            min_value, minimizer, previous_elapsed_time = find_minimizer_resumable(
+                N, candidates, multinomial_confidence_interval, checkpoint_path, fingerprint, start_time=start_time,
+                debug=debug
+            )
+        elif early_exit:
+            min_value, minimizer, skipped_fraction = find_minimizer_early_exit_chunks(
+                N, candidates, multinomial_confidence_interval
+            )
+            recorder.count("minimization", "skipped_fraction", skipped_fraction)
+        elif certify:
+            min_value, minimizer, certified_error, refined = find_minimizer_certified_chunks(
+                N, candidates, multinomial_confidence_interval
+            )
+            recorder.count("minimization", "candidates_refined", refined)
+        else:
+            min_value, minimizer = find_minimizer_chunks(N, candidates, multinomial_confidence_interval)
+    # Counted by the coverage engines themselves, so cached outcome tables and skipped work are not included
+    for counter, value in work.items():
+        recorder.count("minimization", counter, value)
     end_time = time.time()  # End time measurement
-    elapsed_time = end_time - start_time  # Calculate elapsed time
+    elapsed_time = end_time - start_time + previous_elapsed_time  # Calculate elapsed time, over every resumed run
 
     if debug:
         print("Minimum value =", min_value)
         print("Minimizer =", minimizer)
         print("Risk =", 1 - min_value)
+        if certify:
+            print("Certified error =", certified_error)
         print("Elapsed time =", elapsed_time)
 
+    recorder.write_trace(trace_path, N=N, K=K, confidence_interval_function=confidence_interval_function_name,
+                         alpha=confidence_interval_function_alpha, condition=condition_name, min_value=min_value,
+                         certified_error=certified_error, elapsed_time=elapsed_time)
+    risk = record_result(file_path, N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                         condition_name, filtering_status, min_value, minimizer, elapsed_time, debug, result_store,
+                         certified_error)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return risk
+
+
+def record_result(
+        file_path: str,
+        N: int,
+        K: int,
+        confidence_interval_function_name: str,
+        confidence_interval_function_alpha: float,
+        condition_name: str,
+        filtering_status: str,
+        min_value: float,
+        minimizer: List[float],
+        elapsed_time: float,
+        debug: bool = False,
+        result_store: ResultStore = None,
+        certified_error: float = None
+) -> float:
+    """
+    Writes one result row to the result store if given, or appends it to the TSV file otherwise. certified_error, the
+    certified bound on the error of min_value, goes to the Certified Error column, which is left empty when it is None.
+    The file is expected to have the current header; tsv_analysis_multiple and run_sweep bring legacy files up to date
+    once before their first row (see upgrade_tsv_header).
+
+    Returns:
+        float: The risk, 1 - min_value.
+    """
     minimizer_vector = transform_to_probability_vector(minimizer)
     risk = 1 - min_value
 
     # Prepare data as a string formatted for TSV
-    data_row = f"{N}\t{K}\t{confidence_interval_function_name}\t{confidence_interval_function_alpha}\t{condition_name}\t{filtering_status}\t{min_value}\t{minimizer_vector}\t{risk}\t{elapsed_time}\n"
+    data_row = f"{N}\t{K}\t{confidence_interval_function_name}\t{confidence_interval_function_alpha}\t{condition_name}\t{filtering_status}\t{min_value}\t{minimizer_vector}\t{risk}\t{elapsed_time}\t{format_certified_error(certified_error)}\n"
+
+    if result_store is not None:
+        if debug:
+            print("Writing to result store:", data_row)
+        result_store.insert(N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                            condition_name, filtering_status, min_value, minimizer_vector, risk, elapsed_time,
+                            certified_error)
+        return risk
 
     # Write to file
     with open(file_path, 'a') as file:
@@ -110,6 +260,207 @@ def tsv_analysis(
     return risk
 
 
+def tsv_analysis_conditions(
+        N: int,
+        K: int,
+        file_path: str,
+        confidence_interval_function: BaseConfidenceIntervalCalculator,
+        conditions: List[Callable[[List[float]], bool]],
+        alpha: float = 0.05,
+        debug: bool = False,
+        result_store: ResultStore = None,
+        trace_path: str = None
+) -> List[float]:
+    """
+    Same as calling tsv_analysis for each condition, but the coverage of the unfiltered candidate set is computed only
+    once (see coverage_surface) and every condition is answered with a boolean mask and a masked argmin.
+
+    The surface is built by the first condition that is not already recorded, shared by the following ones, and
+    dropped when the call returns, so nothing is computed when every row exists.
+
+    One row is still written per condition. The elapsed time of a row is the time spent on its mask and argmin, plus
+    the time to compute the shared coverage surface for the row that triggered it. With trace_path, each row appends
+    a JSON line with its coverage_surface stage (with the work counted by the coverage engines, which is 0 for the
+    rows that reused the surface), its filtering stage and its minimization stage.
+
+    Returns:
+        List[float]: Risks of the conditions that were not already recorded.
+    """
+    confidence_interval_function_name = confidence_interval_function.__name__
+    confidence_interval_function_alpha = confidence_interval_function.alpha
+
+    risks = []
+    surface = None
+    for condition in conditions:
+        condition_name = condition.__name__ if condition else ''
+        if result_store is not None:
+            exists = result_store.exists(N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                                         condition_name)
+        else:
+            exists = check_existing_entry(file_path, N, K, confidence_interval_function_name,
+                                          confidence_interval_function_alpha, condition_name)
+        if exists:
+            print(
+                f"Entry for N={N}, K={K}, confidence_interval_function={confidence_interval_function_name}, alpha={alpha}, condition={condition_name} already exists. Skipping computation."
+            )
+            continue
+
+        recorder = StageRecorder() if trace_path else NullRecorder()
+        start_time = time.time()  # Start time measurement
+        with recorder.stage("coverage_surface"), count_work() as work:
+            if surface is None:
+                surface = coverage_surface(N, K, confidence_interval_function)
+            candidates, coverage = surface
+        recorder.count("coverage_surface", "candidates_generated", len(candidates))
+        for counter, value in work.items():
+            recorder.count("coverage_surface", counter, value)
+
+        with recorder.stage("filtering"):
+            if condition:
+                mask = condition_mask(transform_to_probability_matrix(candidates), condition)
+                filtering_status = 'True'
+            else:
+                mask = np.ones(len(candidates), dtype=bool)
+                filtering_status = 'False'
+            recorder.count("filtering", "candidates_kept", int(mask.sum()))
+
+        with recorder.stage("minimization"):
+            min_value, minimizer = masked_minimizer(candidates, coverage, mask)
+        elapsed_time = time.time() - start_time
+
+        if debug:
+            print("Condition =", condition_name)
+            print("Minimum value =", min_value)
+            print("Minimizer =", minimizer)
+
+        recorder.write_trace(trace_path, N=N, K=K, confidence_interval_function=confidence_interval_function_name,
+                             alpha=confidence_interval_function_alpha, condition=condition_name,
+                             min_value=min_value, elapsed_time=elapsed_time)
+        risks.append(record_result(file_path, N, K, confidence_interval_function_name,
+                                   confidence_interval_function_alpha, condition_name, filtering_status, min_value,
+                                   minimizer, elapsed_time, debug, result_store))
+
+    return risks
+
+
+def tsv_analysis_threshold_sweep(
+        N: int,
+        K: int,
+        file_path: str,
+        confidence_interval_function: BaseConfidenceIntervalCalculator,
+        feature: Callable[[np.ndarray], np.ndarray],
+        thresholds: List[float],
+        condition_prefix: str,
+        strict: bool = False,
+        alpha: float = 0.05,
+        debug: bool = False,
+        result_store: ResultStore = None
+) -> List[float]:
+    """
+    Records one row per threshold of a monotone condition family, feature(v) >= th (or > th when strict), for the
+    price of a single unfiltered run (see threshold_sweep).
+
+    The rows are named f'{condition_prefix}={th}', like the conditions of multiple_conditions_test, and the
+    elapsed time of the shared computation is recorded on the first row written.
+
+    Parameters:
+        feature (Callable[[np.ndarray], np.ndarray]): Batch feature of the full probability vectors, e.g.
+            entropy_gap_batch for entropy_lower_than_uniform or max_probability_batch for filter_probability_vector.
+        thresholds (List[float]): Thresholds to record.
+        condition_prefix (str): Prefix of the recorded condition names.
+        strict (bool): Compare the feature strictly, as filter_probability_vector does.
+
+    Returns:
+        List[float]: Risks of the thresholds that were not already recorded.
+    """
+    confidence_interval_function_name = confidence_interval_function.__name__
+    confidence_interval_function_alpha = confidence_interval_function.alpha
+
+    pending = []
+    for threshold in thresholds:
+        condition_name = f'{condition_prefix}={threshold}'
+        if result_store is not None:
+            exists = result_store.exists(N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                                         condition_name)
+        else:
+            exists = check_existing_entry(file_path, N, K, confidence_interval_function_name,
+                                          confidence_interval_function_alpha, condition_name)
+        if exists:
+            print(
+                f"Entry for N={N}, K={K}, confidence_interval_function={confidence_interval_function_name}, alpha={alpha}, condition={condition_name} already exists. Skipping computation."
+            )
+        else:
+            pending.append(threshold)
+
+    if not pending:
+        return []
+
+    start_time = time.time()  # Start time measurement
+    candidates, coverage = coverage_surface(N, K, confidence_interval_function)
+    features = feature(transform_to_probability_matrix(candidates))
+    results = threshold_sweep(coverage, features, pending, strict)
+    elapsed_time = time.time() - start_time
+
+    risks = []
+    for threshold, (min_value, index) in zip(pending, results):
+        minimizer = candidates[index].tolist() if index >= 0 else []
+        if debug:
+            print(f"{condition_prefix}={threshold}: minimum value = {min_value}, minimizer = {minimizer}")
+
+        risks.append(record_result(file_path, N, K, confidence_interval_function_name,
+                                   confidence_interval_function_alpha, f'{condition_prefix}={threshold}', 'True',
+                                   min_value, minimizer, elapsed_time, debug, result_store))
+        elapsed_time = 0.
+
+    return risks
+
+
+def tsv_analysis_sweep(
+        N_values: List[int],
+        K: int,
+        file_path: str,
+        confidence_interval_function: BaseConfidenceIntervalCalculator,
+        condition: Callable[[List[float]], bool] = None,
+        alpha: float = 0.05,
+        debug: bool = False,
+        result_store: ResultStore = None
+) -> List[float]:
+    """
+    Records the rows of tsv_analysis for an increasing range of N with sweep_minimizers, which reuses the tables of
+    earlier N and warm-starts each search from the previous minimizer. Rows already recorded are still computed, since
+    they seed the next N, but are not written again.
+
+    Returns:
+        List[float]: Risks of the rows written.
+    """
+    confidence_interval_function_name = confidence_interval_function.__name__
+    confidence_interval_function_alpha = confidence_interval_function.alpha
+    condition_name = condition.__name__ if condition else ''
+    filtering_status = 'True' if condition else 'False'
+
+    risks = []
+    start_time = time.time()  # Start time measurement
+    for N, min_value, minimizer, evaluated in sweep_minimizers(N_values, K, confidence_interval_function,
+                                                               multinomial_method(confidence_interval_function, K),
+                                                               condition, debug=debug):
+        elapsed_time = time.time() - start_time
+
+        if result_store is not None:
+            exists = result_store.exists(N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                                         condition_name)
+        else:
+            exists = check_existing_entry(file_path, N, K, confidence_interval_function_name,
+                                          confidence_interval_function_alpha, condition_name)
+        if not exists:
+            risks.append(record_result(file_path, N, K, confidence_interval_function_name,
+                                       confidence_interval_function_alpha, condition_name, filtering_status,
+                                       min_value, minimizer, elapsed_time, debug, result_store))
+
+        start_time = time.time()
+
+    return risks
+
+
 def tsv_analysis_multiple(
         N_values: List[int],
         K_values: List[int],
@@ -117,25 +468,70 @@ def tsv_analysis_multiple(
         confidence_interval_function_values: List[BaseConfidenceIntervalCalculator],
         conditions: List[Callable[[List[float]], bool]] = None,
         alpha: float = 0.05,
-        debug: bool = False
+        debug: bool = False,
+        result_store: ResultStore = None,
+        shared_coverage: bool = False,
+        trace_path: str = None,
+        certify: bool = False,
+        checkpoint_path: str = None
 ) -> List[float]:
+    """
+    Runs tsv_analysis over every combination of the parameters.
+
+    Results go to the TSV file, or, when result_store is given, to the result store, which is then exported to the TSV
+    file once all combinations are done. With shared_coverage, the conditions of each (N, K, confidence interval
+    function) are answered together by tsv_analysis_conditions from a single coverage computation. trace_path is
+    passed on to tsv_analysis or tsv_analysis_conditions. With certify, every minimum value is recorded with its
+    certified error (see tsv_analysis); the shared coverage surface is not certified, so the two cannot be combined.
+    With checkpoint_path, every row is resumable (see tsv_analysis) from its own file, derived from checkpoint_path by
+    row_checkpoint_path; the shared coverage surface is not checkpointed. Calculators built for a number of categories
+    k are only run with K = k.
+    """
+    if certify and shared_coverage:
+        raise ValueError("The shared coverage surface is not certified; use certify without shared_coverage.")
+    if checkpoint_path and shared_coverage:
+        raise ValueError("The shared coverage surface is not checkpointed; use checkpoint_path without "
+                         "shared_coverage.")
+
     # Check if file exists and write headers if it doesn't
-    if not os.path.exists(file_path):
+    if result_store is None and not os.path.exists(file_path):
         if debug:
             print(f"{file_path} does not exist. Creating file and adding headers.")
         with open(file_path, 'w') as f:
-            f.write(
-                "N\tK\tConfidence Interval Function\tConfidence Interval Function Alpha\tCondition\tFiltering\tMinimum Value\tMinimizer\tRisk\tElapsed Time\n"
-            )
+            f.write("\t".join(TSV_HEADER) + "\n")
+    elif result_store is None:
+        # Rows are appended in the current format, so a legacy file gets its Certified Error column once, up front
+        upgrade_tsv_header(file_path)
+    elif os.path.exists(file_path):
+        # Rows already in the TSV file are skipped, and kept by the final export
+        result_store.import_tsv(file_path)
 
     risks = []
     for N in N_values:
         for K in K_values:
             for confidence_interval_function in confidence_interval_function_values:
+                if getattr(confidence_interval_function, 'k', K) != K:
+                    continue  # Calculators of simultaneous methods are built for a single number of categories
+
+                if shared_coverage:
+                    risks.extend(tsv_analysis_conditions(N, K, file_path, confidence_interval_function, conditions,
+                                                         alpha, debug, result_store, trace_path))
+                    continue
+
                 for condition in conditions:
-                    risk = tsv_analysis(N, K, file_path, confidence_interval_function, condition, alpha, debug)
+                    row_checkpoint = None
+                    if checkpoint_path:
+                        row_checkpoint = row_checkpoint_path(checkpoint_path, N, K,
+                                                             confidence_interval_function.__name__,
+                                                             confidence_interval_function.alpha,
+                                                             condition.__name__ if condition else '')
+                    risk = tsv_analysis(N, K, file_path, confidence_interval_function, condition, alpha, debug,
+                                        result_store, trace_path, certify, checkpoint_path=row_checkpoint)
                     if risk is not None:
                         risks.append(risk)
+
+    if result_store is not None:
+        result_store.export_tsv(file_path)
     return risks
 
 
@@ -145,12 +541,12 @@ if __name__ == '__main__':
     N_values = [200]
     K_values = [3]  # Assuming we want to use a single K value, but it could be a list of values
     conf_interval = ConfidenceIntervalCalculator()
-    confidence_interval_functions = [conf_interval]  # List of functions
+    confidence_interval_functions = [conf_interval, GoodmanConfidenceIntervalCalculator(3)]  # List of functions
     conditions: List[Callable[[List[float]], bool]] = []
     thresholds = [0.9]
     for th in thresholds:
-        condition = lambda v: filter_probability_vector(v, threshold=th)
-        condition.__name__ = f'Threshold={th}'  # Name the lambda for file recording
+        # Named for file recording
+        condition = vectorized_condition(filter_probability_vector_batch, name=f'Threshold={th}', threshold=th)
         conditions.append(condition)
 
         # Execute analysis for each condition
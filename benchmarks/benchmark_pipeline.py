@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import sys
+import time
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix
+from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.coverage_probability import coverage_probability
+from find_minimizer.find_minimizer import find_minimizer_batched
+from weighted_simplex.find_minimizer import find_skewed_average_minimizer
+
+# Standard (N, K, alpha) grid; every point is run with the Fitzpatrick and Scott intervals
+STANDARD_GRID: List[Tuple[int, int, float]] = [
+    (20, 3, 0.05),
+    (50, 3, 0.05),
+    (100, 3, 0.05),
+    (15, 4, 0.05),
+]
+
+# Stages that evaluate one coverage probability per candidate in pure Python only see this many candidates
+SCALAR_CANDIDATE_LIMIT = 50
+
+# Fast stages are called in a loop until one measurement lasts at least this long
+MIN_MEASUREMENT_SECONDS = 0.05
+
+DEFAULT_TOLERANCE = 0.2
+
+
+def _best_time(function: Callable[[], object], repeats: int) -> float:
+    """
+    Returns the smallest wall time per call of the function over several measurements.
+
+    As in timeit, each measurement loops the function enough times to last MIN_MEASUREMENT_SECONDS, so that stages
+    running in microseconds are not dominated by timer noise.
+    """
+    loops = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= MIN_MEASUREMENT_SECONDS:
+            break
+        loops *= 10
+
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start_time = time.perf_counter()
+        for _ in range(loops):
+            function()
+        best = min(best, (time.perf_counter() - start_time) / loops)
+    return best
+
+
+def _result(stage: str, N: int, K: int, alpha: float, method: str, seconds: float, candidates: int,
+            outcomes: int) -> Dict[str, object]:
+    return {
+        "stage": stage, "N": N, "K": K, "alpha": alpha, "method": method, "seconds": seconds,
+        "candidates": candidates, "outcomes": outcomes,
+        "candidates_per_second": candidates / seconds if seconds > 0 else float('inf'),
+        "outcomes_per_second": outcomes / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def benchmark_point(N: int, K: int, alpha: float, repeats: int = 3) -> List[Dict[str, object]]:
+    """
+    Benchmarks every stage of the coverage pipeline at one grid point.
+
+    Throughput is counted in candidates (probability vectors evaluated) and outcomes (candidate x outcome pairs
+    covered by the coverage computation, C(N + K - 1, K - 1) per candidate).
+    """
+    confidence_interval_function = ConfidenceIntervalCalculator(alpha)
+    method = confidence_interval_function.__name__
+    outcomes_per_candidate = math.comb(N + K - 1, K - 1)
+    multinomial_interval = multinomial_confidence_intervals if alpha == 0.05 else \
+        partial(multinomial_confidence_intervals, alpha=alpha)
+
+    ranked_endpoints = rank_endpoints(N, confidence_interval_function)
+    candidates = generate_unique_matrix(K - 1, ranked_endpoints)
+    scalar_candidates = candidates[:SCALAR_CANDIDATE_LIMIT]
+
+    def weight_function(vector: np.ndarray) -> float:
+        return float(np.max(vector))
+
+    def skewed_average():
+        with contextlib.redirect_stdout(io.StringIO()):
+            find_skewed_average_minimizer(N, scalar_candidates, multinomial_interval, weight_function)
+
+    results = [
+        _result("rank_endpoints", N, K, alpha, method,
+                _best_time(lambda: rank_endpoints(N, confidence_interval_function), repeats),
+                len(ranked_endpoints), 0),
+        _result("generate_unique_matrix", N, K, alpha, method,
+                _best_time(lambda: generate_unique_matrix(K - 1, ranked_endpoints), repeats),
+                len(candidates), 0),
+        _result("coverage_probability", N, K, alpha, method,
+                _best_time(lambda: [coverage_probability(N, p, multinomial_interval) for p in scalar_candidates],
+                           repeats),
+                len(scalar_candidates), len(scalar_candidates) * outcomes_per_candidate),
+        _result("find_minimizer", N, K, alpha, method,
+                _best_time(lambda: find_minimizer_batched(N, candidates, multinomial_interval), repeats),
+                len(candidates), len(candidates) * outcomes_per_candidate),
+        _result("find_skewed_average_minimizer", N, K, alpha, method, _best_time(skewed_average, repeats),
+                len(scalar_candidates), len(scalar_candidates) * outcomes_per_candidate),
+    ]
+    return results
+
+
+def run_benchmarks(output_path: str, grid: List[Tuple[int, int, float]] = None, repeats: int = 3) -> Dict:
+    """Runs the benchmark grid and writes the results, with a description of the environment, to a JSON file."""
+    results = []
+    for N, K, alpha in grid or STANDARD_GRID:
+        for result in benchmark_point(N, K, alpha, repeats):
+            print(f"{result['stage']:<32} N={N:<4} K={K} alpha={alpha}: {result['seconds']:.4f} s, "
+                  f"{result['candidates_per_second']:.1f} candidates/s, {result['outcomes_per_second']:.1f} outcomes/s")
+            results.append(result)
+
+    report = {
+        "environment": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "repeats": repeats,
+        "results": results,
+    }
+    with open(output_path, 'w') as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+def compare_benchmarks(baseline_path: str, current_path: str, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compares two benchmark files and lists the regressions.
+
+    A regression is a (stage, N, K, alpha, method) whose candidate throughput dropped by more than the tolerance,
+    as a fraction of the baseline throughput.
+
+    Returns:
+        List[str]: One line per regression.
+    """
+    def load(path: str) -> Dict[Tuple, Dict]:
+        with open(path, 'r') as file:
+            report = json.load(file)
+        return {(r["stage"], r["N"], r["K"], r["alpha"], r["method"]): r for r in report["results"]}
+
+    baseline, current = load(baseline_path), load(current_path)
+    regressions = []
+    for key, result in current.items():
+        if key not in baseline:
+            continue
+
+        before, after = baseline[key]["candidates_per_second"], result["candidates_per_second"]
+        change = after / before - 1 if before > 0 else 0.
+        flag = change < -tolerance
+        print(f"{'REGRESSION' if flag else 'ok':<10} {key[0]:<32} N={key[1]:<4} K={key[2]} alpha={key[3]}: "
+              f"{before:.1f} -> {after:.1f} candidates/s ({change:+.1%})")
+        if flag:
+            regressions.append(f"{key}: {before:.1f} -> {after:.1f} candidates/s ({change:+.1%})")
+
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the coverage pipeline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the standard grid and write a JSON report.")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--repeats", type=int, default=3)
+
+    compare_parser = subparsers.add_parser("compare", help="Flag throughput regressions against a baseline.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run_benchmarks(args.output, repeats=args.repeats)
+        return 0
+
+    regressions = compare_benchmarks(args.baseline, args.current, args.tolerance)
+    print(f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+# Example usage:
+#   python -m benchmarks.benchmark_pipeline run --output benchmark_results.json
+#   python -m benchmarks.benchmark_pipeline compare benchmarks/baseline.json benchmark_results.json
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,102 @@
-from itertools import combinations_with_replacement
-from typing import List
+from typing import Iterator, List, Sequence
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def generate_unique_index_chunks(
+        k: int,
+        elements: Sequence[float],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        lower: Sequence[int] = None,
+        upper: Sequence[int] = None
+) -> Iterator[np.ndarray]:
+    """
+    Lazily enumerates the non-decreasing index tuples (i1 <= ... <= ik) into the sorted list of elements whose
+    elements sum to at most 1, in lexicographic order.
+
+    Sums are accumulated left to right exactly like sum(combination), and a prefix is abandoned as soon as even
+    repeating its last element cannot keep the sum at or below 1.
+
+    Parameters:
+        k (int): Size of each tuple.
+        elements (Sequence[float]): Sorted, distinct elements.
+        chunk_size (int): Approximate number of rows per yielded chunk.
+        lower (Sequence[int]): Optional smallest index allowed in each position.
+        upper (Sequence[int]): Optional largest index allowed in each position.
+
+    Returns:
+        Iterator[np.ndarray]: Integer arrays of shape (M, k).
+    """
+    elements = np.asarray(elements, dtype=np.float64)
+    lower = [0] * k if lower is None else [int(i) for i in lower]
+    upper = [len(elements) - 1] * k if upper is None else [int(i) for i in upper]
+
+    buffer: List[np.ndarray] = []
+    buffered_rows = 0
+    prefix = [0] * (k - 1)
+
+    def walk(position: int, start: int, partial_sum: float) -> Iterator[np.ndarray]:
+        nonlocal buffered_rows
+        start = max(start, lower[position])
+
+        if position == k - 1:
+            last = np.arange(start, upper[position] + 1)
+            sums = partial_sum + elements[last]
+            last = last[:np.searchsorted(sums, 1, side='right')]
+            if len(last):
+                block = np.empty((len(last), k), dtype=np.int64)
+                block[:, :k - 1] = prefix
+                block[:, k - 1] = last
+                buffer.append(block)
+                buffered_rows += len(block)
+                if buffered_rows >= chunk_size:
+                    yield np.concatenate(buffer)
+                    buffer.clear()
+                    buffered_rows = 0
+            return
+
+        for i in range(start, upper[position] + 1):
+            value = float(elements[i])
+            smallest_completion = partial_sum
+            for _ in range(k - position):
+                smallest_completion += value
+            if smallest_completion > 1:
+                break
+            prefix[position] = i
+            yield from walk(position + 1, i, partial_sum + value)
+
+    if len(elements) > 0 and k > 0:
+        yield from walk(0, 0, 0)
+
+    if buffer:
+        yield np.concatenate(buffer)
+
+
+def generate_unique_matrix_chunks(
+        k: int,
+        elements: Sequence[float],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        lower: Sequence[int] = None,
+        upper: Sequence[int] = None
+) -> Iterator[np.ndarray]:
+    """
+    Lazily generates the rows of generate_unique_matrix as float arrays of shape (M, k), in lexicographic order and
+    without holding the whole candidate set in memory. See generate_unique_index_chunks for the parameters.
+    """
+    elements = np.asarray(elements, dtype=np.float64)
+    for chunk in generate_unique_index_chunks(k, elements, chunk_size, lower, upper):
+        yield elements[chunk]
 
 
 def generate_unique_matrix(k: int, elements: List[float]) -> List[List[float]]:
     """Generates a unique matrix where each row is a vector of size n,
     composed of elements from the list, and the sum of the elements in each row is ≤ 1.
     Rows are considered unique if they are not permutations of each other."""
-    unique_rows = set()
-
-    # Generate all possible combinations with replacement of the elements with size n
-    for combination in combinations_with_replacement(elements, k):
-        if sum(combination) <= 1:
-            # Sort the combination to ensure permutations are considered identical
-            sorted_combination = tuple(sorted(combination))
-            unique_rows.add(sorted_combination)
-
-    # Convert the set of unique rows back to a list of lists
-    matrix = [list(row) for row in unique_rows]
+    # Sorted rows of sorted, distinct elements are unique by construction, so no set of seen rows is needed
+    elements = sorted(set(elements))
+    matrix = [row for chunk in generate_unique_matrix_chunks(k, elements) for row in chunk.tolist()]
     return matrix
 
 
@@ -27,3 +107,6 @@ if __name__ == "__main__":
     result_matrix = generate_unique_matrix(k_, elements_)
     for r in result_matrix:
         print(r)
+
+    for chunk_ in generate_unique_matrix_chunks(3, [0.1, 0.2, 0.3, 0.4], chunk_size=4):
+        print(chunk_)
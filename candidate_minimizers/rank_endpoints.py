@@ -33,14 +33,10 @@ def rank_endpoints(
         precision: int = 10
 ) -> List[float]:
     """Ranks the endpoints of the confidence intervals generated by the provided function."""
-    endpoints: set[float] = set()
-
-    # For each Xi = 0, ..., N, compute the confidence interval and collect endpoints
-    for i in range(n + 1):
-        interval = confidence_interval_function.calculate(i / n, n)
-        # Round to specified precision to handle very close values
-        endpoints.add(round(interval[0], precision))
-        endpoints.add(round(interval[1], precision))
+    # Collect the endpoints of the confidence intervals of every count Xi = 0, ..., N
+    all_endpoints: List[float] = confidence_interval_function.endpoints(n).tolist()
+    # Round to specified precision to handle very close values
+    endpoints: set[float] = {round(endpoint, precision) for endpoint in all_endpoints}
 
     # Filter endpoints to keep those between 0 and 1
     filtered_endpoints: set[float] = {ep for ep in endpoints if 0 < ep < 1}
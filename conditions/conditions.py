@@ -2,6 +2,9 @@
 import math
 from typing import List
 
+import numpy as np
+from scipy.special import entr
+
 
 def min_prob_small(prob_vector: List[float], threshold: float = 0.01) -> bool:
     return min(prob_vector) < threshold
@@ -38,6 +41,51 @@ def top_k_dominance(prob_vector: List[float], k: int = 2, dominance_threshold: f
     return top_k_sum / sum(sorted_probs) >= dominance_threshold
 
 
+# Batch counterparts: each takes an (M, K) matrix of probability vectors and returns a boolean mask of length M
+def min_prob_small_batch(prob_matrix: np.ndarray, threshold: float = 0.01) -> np.ndarray:
+    return np.asarray(prob_matrix).min(axis=1) < threshold
+
+
+def entropy_gap_batch(prob_matrix: np.ndarray) -> np.ndarray:
+    """Returns log(K) minus the entropy of each row, the quantity compared by entropy_lower_than_uniform."""
+    prob_matrix = np.asarray(prob_matrix)
+    return math.log(prob_matrix.shape[1]) - entr(prob_matrix).sum(axis=1)
+
+
+def entropy_lower_than_uniform_batch(prob_matrix: np.ndarray, threshold: float = 0.1) -> np.ndarray:
+    prob_matrix = np.asarray(prob_matrix)
+    if prob_matrix.shape[1] <= 1:
+        return np.zeros(len(prob_matrix), dtype=bool)
+    return entropy_gap_batch(prob_matrix) >= threshold
+
+
+def sparsity_batch(prob_matrix: np.ndarray, sparsity_threshold: float = 0.01, proportion: float = 0.8) -> np.ndarray:
+    prob_matrix = np.asarray(prob_matrix)
+    return (prob_matrix < sparsity_threshold).sum(axis=1) / prob_matrix.shape[1] >= proportion
+
+
+def decisiveness_batch(prob_matrix: np.ndarray, dominance_ratio: float = 2.0) -> np.ndarray:
+    prob_matrix = np.asarray(prob_matrix)
+    if prob_matrix.shape[1] < 2:
+        return np.ones(len(prob_matrix), dtype=bool)
+    top_two = -np.sort(-prob_matrix, axis=1)[:, :2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return top_two[:, 0] / top_two[:, 1] > dominance_ratio
+
+
+def top_k_dominance_batch(prob_matrix: np.ndarray, k: int = 2, dominance_threshold: float = 0.75) -> np.ndarray:
+    sorted_probs = -np.sort(-np.asarray(prob_matrix), axis=1)
+    return sorted_probs[:, :k].sum(axis=1) / sorted_probs.sum(axis=1) >= dominance_threshold
+
+
+# Calling a predicate with its default parameters on a whole matrix goes through its batch counterpart
+min_prob_small.batch = min_prob_small_batch
+entropy_lower_than_uniform.batch = entropy_lower_than_uniform_batch
+sparsity.batch = sparsity_batch
+decisiveness.batch = decisiveness_batch
+top_k_dominance.batch = top_k_dominance_batch
+
+
 if __name__ == '__main__':
     # Example usage:
     example_vector = [0.9, 0.05, 0.03, 0.01, 0.01]
@@ -62,3 +110,8 @@ if __name__ == '__main__':
     # Checking the properties
     print("Decisiveness:", decisiveness(example_vector))
     print("Top-k Dominance (k=2):", top_k_dominance(example_vector))
+
+    # Batch usage:
+    example_matrix = np.array([[0.8, 0.15, 0.04, 0.01], [0.25, 0.25, 0.25, 0.25]])
+    print("Entropy Lower Than Uniform (batch):", entropy_lower_than_uniform_batch(example_matrix))
+    print("Decisiveness (batch):", decisiveness_batch(example_matrix))
@@ -0,0 +1,134 @@
+import inspect
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Maps a multinomial interval method to a function (n, k, alpha) -> (lower, upper) tabulating, for every count
+# 0, ..., n, the interval the method assigns to a category with that count
+_per_count_methods: Dict[Callable, Callable[[int, int, float], Tuple[np.ndarray, np.ndarray]]] = {}
+
+
+def register_per_count_method(
+        method: Callable[[List[int]], List[Tuple[float, float]]],
+        count_intervals: Callable[[int, int, float], Tuple[np.ndarray, np.ndarray]]
+) -> None:
+    """
+    Declares that the interval of each category under `method` depends only on its own count and on n.
+
+    Parameters:
+        method (Callable): Multinomial interval method taking a count vector and an `alpha` keyword.
+        count_intervals (Callable): Function (n, k, alpha) returning the lower and upper bounds indexed by count.
+    """
+    _per_count_methods[method] = count_intervals
+
+
+class AcceptanceIndex:
+    def __init__(self, lower_bounds: np.ndarray, upper_bounds: np.ndarray):
+        """
+        Turns per-count interval bounds into admissible counts for a candidate probability.
+
+        A count x covers p_i when lower_bounds[x] <= p_i <= upper_bounds[x]. When both bounds are non-decreasing in x
+        the admissible counts form a contiguous range [a_i, b_i] found by binary search; otherwise they are kept as
+        a boolean mask over 0, ..., n.
+
+        Parameters:
+            lower_bounds (np.ndarray): Lower bounds of the intervals, indexed by count.
+            upper_bounds (np.ndarray): Upper bounds of the intervals, indexed by count.
+        """
+        self.lower_bounds = np.asarray(lower_bounds, dtype=np.float64)
+        self.upper_bounds = np.asarray(upper_bounds, dtype=np.float64)
+        self.n = len(self.lower_bounds) - 1
+        self.contiguous = bool(np.all(np.diff(self.lower_bounds) >= 0) and np.all(np.diff(self.upper_bounds) >= 0))
+
+    def ranges(self, p: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the admissible count ranges of each coordinate of p.
+
+        Parameters:
+            p (np.ndarray): Probabilities of any shape.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Arrays a and b of the same shape as p; the admissible counts of p[...] are
+            a[...] <= x <= b[...], and the range is empty when a > b.
+        """
+        if not self.contiguous:
+            raise ValueError("The admissible counts of this method are not contiguous; use masks instead.")
+
+        p = np.asarray(p, dtype=np.float64)
+        first = np.searchsorted(self.upper_bounds, p, side='left')
+        last = np.searchsorted(self.lower_bounds, p, side='right') - 1
+        return first, last
+
+    def masks(self, p: np.ndarray) -> np.ndarray:
+        """Returns a boolean array of shape p.shape + (n + 1,) marking the counts whose interval covers p."""
+        p = np.asarray(p, dtype=np.float64)[..., None]
+        return (self.lower_bounds <= p) & (p <= self.upper_bounds)
+
+    def covers(self, counts: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """
+        Checks which outcomes cover which candidates on their leading coordinates.
+
+        Parameters:
+            counts (np.ndarray): Integer array of shape (C, d) with the leading counts of C outcomes.
+            p (np.ndarray): Array of shape (T, d) with T candidates, or (d,) for a single candidate.
+
+        Returns:
+            np.ndarray: Boolean array of shape (T, C), or (C,) for a single candidate.
+        """
+        p = np.asarray(p, dtype=np.float64)
+        single = p.ndim == 1
+        p = np.atleast_2d(p)
+
+        if self.contiguous:
+            first, last = self.ranges(p)
+            covered = np.all(
+                (first[:, None, :] <= counts[None, :, :]) & (counts[None, :, :] <= last[:, None, :]), axis=2
+            )
+        else:
+            masks = self.masks(p)
+            covered = np.ones((len(p), len(counts)), dtype=bool)
+            for i in range(p.shape[1]):
+                covered &= masks[:, i, counts[:, i]]
+
+        return covered[0] if single else covered
+
+
+def _unwrap(method: Callable) -> Tuple[Callable, dict]:
+    """Unwraps functools.partial and returns the underlying method with the keywords it is called with."""
+    keywords = {}
+    while isinstance(method, partial):
+        keywords = {**method.keywords, **keywords}
+        method = method.func
+    return method, keywords
+
+
+@lru_cache(maxsize=64)
+def acceptance_index(method: Callable[[List[int]], List[Tuple[float, float]]], n: int, k: int) -> AcceptanceIndex | None:
+    """
+    Builds the acceptance index of a multinomial interval method, once per (method, n, alpha).
+
+    Parameters:
+        method (Callable): Multinomial interval method, optionally wrapped in functools.partial to fix alpha.
+        n (int): Number of trials.
+        k (int): Number of categories.
+
+    Returns:
+        AcceptanceIndex | None: The index, or None when the intervals of the method are not per-count.
+    """
+    base_method, keywords = _unwrap(method)
+    if base_method not in _per_count_methods:
+        return None
+
+    alpha = keywords.get('alpha', inspect.signature(base_method).parameters['alpha'].default)
+    lower_bounds, upper_bounds = _per_count_methods[base_method](n, k, alpha)
+    return AcceptanceIndex(lower_bounds, upper_bounds)
+
+
+if __name__ == '__main__':
+    # Example usage
+    from confidence_intervals.multinomial_confidence_intervals import fitzpatrick_scott_count_intervals
+
+    index = AcceptanceIndex(*fitzpatrick_scott_count_intervals(20, 3))
+    print("Admissible count ranges for p = (0.2, 0.5):", index.ranges(np.array([0.2, 0.5])))
+    print(index.covers(np.array([[4, 10], [0, 20], [8, 10]]), np.array([0.2, 0.5])))
@@ -0,0 +1,166 @@
+from functools import lru_cache, partial
+from typing import List, Tuple
+
+import numpy as np
+import scipy.stats as stats
+
+from confidence_intervals.acceptance_index import register_per_count_method
+from confidence_intervals.confidence_interval import BaseConfidenceIntervalCalculator
+
+
+@lru_cache(maxsize=None)
+def goodman_chi_square(k: int, alpha: float) -> float:
+    """Returns the Bonferroni-corrected chi-square quantile chi2_{1 - alpha/k}(1) of Goodman's intervals."""
+    return float(stats.chi2.ppf(1 - alpha / k, 1))
+
+
+@lru_cache(maxsize=None)
+def quesenberry_hurst_chi_square(k: int, alpha: float) -> float:
+    """Returns the chi-square quantile chi2_{1 - alpha}(k - 1) of Quesenberry and Hurst's intervals."""
+    return float(stats.chi2.ppf(1 - alpha, k - 1))
+
+
+class ChiSquareConfidenceIntervalCalculator(BaseConfidenceIntervalCalculator):
+    def __init__(self, chi_square: float, alpha: float = 0.05):
+        """
+        Initializes the calculator of the score intervals
+        (A + 2x -+ sqrt(A (A + 4x (n - x) / n))) / (2 (n + A)) for a chi-square quantile A.
+        """
+        super().__init__(alpha)
+        self.__name__ = "Chi_Square"  # Assigning a name to the derived class
+        self.chi_square = chi_square
+
+    def calculate(self, p_hat: float, n: int) -> Tuple[float, float]:
+        """
+        Calculates the confidence interval for a proportion p_hat with sample size n.
+
+        Parameters:
+            p_hat (float): Sample proportion.
+            n (int): Sample size.
+
+        Returns:
+            Tuple[float, float]: Lower and upper bounds of the confidence interval.
+        """
+        lower_bounds, upper_bounds = self.calculate_batch(np.array([p_hat * n]), n)
+        return float(lower_bounds[0]), float(upper_bounds[0])
+
+    def calculate_batch(self, counts: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the confidence intervals of the proportions counts / n for an array of counts.
+
+        Parameters:
+            counts (np.ndarray): Counts, each between 0 and n.
+            n (int): Sample size.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Lower and upper bounds, clipped to [0, 1], with the shape of counts.
+        """
+        x = np.asarray(counts, dtype=np.float64)
+        a = self.chi_square
+        centre = a + 2 * x
+        half_width = np.sqrt(a * (a + 4 * x * (n - x) / n))
+
+        lower_bounds = np.maximum((centre - half_width) / (2 * (n + a)), 0)
+        upper_bounds = np.minimum((centre + half_width) / (2 * (n + a)), 1)
+        return lower_bounds, upper_bounds
+
+
+class GoodmanConfidenceIntervalCalculator(ChiSquareConfidenceIntervalCalculator):
+    def __init__(self, k: int, alpha: float = 0.05):
+        """
+        Initializes the calculator of Goodman's simultaneous intervals for k categories, which use the quantile
+        chi2_{1 - alpha/k}(1).
+        """
+        super().__init__(goodman_chi_square(k, alpha), alpha)
+        self.__name__ = "Goodman"  # Assigning a name to the derived class
+        self.k = k
+        self.multinomial_confidence_interval = partial(goodman_confidence_intervals, alpha=alpha)
+
+
+class QuesenberryHurstConfidenceIntervalCalculator(ChiSquareConfidenceIntervalCalculator):
+    def __init__(self, k: int, alpha: float = 0.05):
+        """
+        Initializes the calculator of Quesenberry and Hurst's simultaneous intervals for k categories, which use the
+        quantile chi2_{1 - alpha}(k - 1).
+        """
+        super().__init__(quesenberry_hurst_chi_square(k, alpha), alpha)
+        self.__name__ = "Quesenberry_and_Hurst"  # Assigning a name to the derived class
+        self.k = k
+        self.multinomial_confidence_interval = partial(quesenberry_hurst_confidence_intervals, alpha=alpha)
+
+
+@lru_cache(maxsize=64)
+def goodman_count_intervals(n: int, k: int, alpha: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tabulates Goodman's intervals for every count 0, ..., n.
+
+    Parameters:
+        n (int): Total count.
+        k (int): Number of categories.
+        alpha (float): Significance level.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Lower and upper bounds indexed by count, each of length n + 1.
+    """
+    return ChiSquareConfidenceIntervalCalculator(goodman_chi_square(k, alpha), alpha).interval_table(n)
+
+
+@lru_cache(maxsize=64)
+def quesenberry_hurst_count_intervals(n: int, k: int, alpha: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tabulates Quesenberry and Hurst's intervals for every count 0, ..., n.
+
+    Parameters:
+        n (int): Total count.
+        k (int): Number of categories.
+        alpha (float): Significance level.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Lower and upper bounds indexed by count, each of length n + 1.
+    """
+    return ChiSquareConfidenceIntervalCalculator(quesenberry_hurst_chi_square(k, alpha), alpha).interval_table(n)
+
+
+def goodman_confidence_intervals(x: List[int], alpha: float = 0.05) -> List[Tuple[float, float]]:
+    """
+    Calculates Goodman's simultaneous confidence intervals for the probabilities of a multinomial distribution.
+
+    Parameters:
+        x (List[int]): List of counts for each category.
+        alpha (float): Significance level for the confidence intervals, default is 0.05 for 95% confidence.
+
+    Returns: List[Tuple[float, float]]: Each tuple contains the lower and upper bounds of the confidence interval for
+    each probability.
+    """
+    lower_bounds, upper_bounds = goodman_count_intervals(sum(x), len(x), alpha)
+    return [(lower_bounds[count], upper_bounds[count]) for count in x]
+
+
+def quesenberry_hurst_confidence_intervals(x: List[int], alpha: float = 0.05) -> List[Tuple[float, float]]:
+    """
+    Calculates Quesenberry and Hurst's simultaneous confidence intervals for the probabilities of a multinomial
+    distribution.
+
+    Parameters:
+        x (List[int]): List of counts for each category.
+        alpha (float): Significance level for the confidence intervals, default is 0.05 for 95% confidence.
+
+    Returns: List[Tuple[float, float]]: Each tuple contains the lower and upper bounds of the confidence interval for
+    each probability.
+    """
+    lower_bounds, upper_bounds = quesenberry_hurst_count_intervals(sum(x), len(x), alpha)
+    return [(lower_bounds[count], upper_bounds[count]) for count in x]
+
+
+register_per_count_method(goodman_confidence_intervals, goodman_count_intervals)
+register_per_count_method(quesenberry_hurst_confidence_intervals, quesenberry_hurst_count_intervals)
+
+# Example usage:
+if __name__ == "__main__":
+    counts = [100, 200, 700]  # Example counts for three categories
+    risk = 0.05  # 95% confidence level
+
+    for method in (goodman_confidence_intervals, quesenberry_hurst_confidence_intervals):
+        print(method.__name__)
+        for i, (lower, upper) in enumerate(method(counts, risk)):
+            print(f"Category {i + 1}: ({lower:.4f}, {upper:.4f})")
@@ -1,9 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, Tuple
 
+import numpy as np
 import scipy.stats as stats
 
 
+@lru_cache(maxsize=None)
+def z_alpha_half(alpha: float) -> float:
+    """Returns the standard normal quantile z_{1 - alpha/2}, computed once per alpha."""
+    return float(stats.norm.ppf(1 - alpha / 2))
+
+
 class BaseConfidenceIntervalCalculator(ABC):
     def __init__(self, alpha: float = 0.05):
         """
@@ -11,6 +19,7 @@ class BaseConfidenceIntervalCalculator(ABC):
         """
         self.alpha = alpha
         self.__name__ = "BaseConfidenceIntervalCalculator"  # Assigning a name to the base class
+        self._interval_tables: Dict[Tuple[int, float], Tuple[np.ndarray, np.ndarray]] = {}
 
     @abstractmethod
     def calculate(self, p_hat: float, n: int) -> Tuple[float, float]:
@@ -26,6 +35,51 @@ class BaseConfidenceIntervalCalculator(ABC):
         """
         pass
 
+    def calculate_batch(self, counts: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the confidence intervals of the proportions counts / n for an array of counts.
+
+        This fallback calls calculate once per count, so any calculator supports it; subclasses with a closed form
+        override it with an array expression returning the same values.
+
+        Parameters:
+            counts (np.ndarray): Counts, each between 0 and n.
+            n (int): Sample size.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Lower and upper bounds, with the shape of counts.
+        """
+        counts = np.asarray(counts)
+        intervals = [self.calculate(count / n, n) for count in counts.ravel().tolist()]
+        bounds = np.array(intervals, dtype=np.float64).reshape(len(intervals), 2)
+        return bounds[:, 0].reshape(counts.shape), bounds[:, 1].reshape(counts.shape)
+
+    def interval_table(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the read-only lower and upper bounds for every count 0, ..., n, memoised per (n, alpha).
+
+        Parameters:
+            n (int): Sample size.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Lower and upper bounds indexed by count, each of length n + 1.
+        """
+        key = (n, self.alpha)
+        if key not in self._interval_tables:
+            lower_bounds, upper_bounds = self.calculate_batch(np.arange(n + 1), n)
+            lower_bounds.flags.writeable = False
+            upper_bounds.flags.writeable = False
+            self._interval_tables[key] = lower_bounds, upper_bounds
+        return self._interval_tables[key]
+
+    def endpoints(self, n: int) -> np.ndarray:
+        """
+        Returns every interval endpoint the method can produce for sample size n, from which rank_endpoints builds
+        the candidate grid. By default these are the endpoints of interval_table.
+        """
+        lower_bounds, upper_bounds = self.interval_table(n)
+        return np.concatenate([lower_bounds, upper_bounds])
+
 
 class ConfidenceIntervalCalculator(BaseConfidenceIntervalCalculator):
     def __init__(self, alpha: float = 0.05):
@@ -34,6 +88,7 @@ class ConfidenceIntervalCalculator(BaseConfidenceIntervalCalculator):
         """
         super().__init__(alpha)
         self.__name__ = "Fitzpatrick_and_Scott"  # Assigning a name to the derived class
+        self.z_alpha_half = z_alpha_half(alpha)
 
     def calculate(self, p_hat: float, n: int) -> Tuple[float, float]:
         """
@@ -46,14 +101,29 @@ class ConfidenceIntervalCalculator(BaseConfidenceIntervalCalculator):
         Returns:
             Tuple[float, float]: Lower and upper bounds of the confidence interval.
         """
-        z_alpha_half = stats.norm.ppf(1 - self.alpha / 2)
-        margin_of_error = z_alpha_half / (2 * (n ** 0.5))
+        margin_of_error = self.z_alpha_half / (2 * (n ** 0.5))
 
         lower_bound = p_hat - margin_of_error
         upper_bound = p_hat + margin_of_error
 
         return lower_bound, upper_bound
 
+    def calculate_batch(self, counts: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the confidence intervals of the proportions counts / n for an array of counts, with the same values
+        as calculate.
+
+        Parameters:
+            counts (np.ndarray): Counts, each between 0 and n.
+            n (int): Sample size.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Lower and upper bounds, with the shape of counts.
+        """
+        p_hat = np.asarray(counts) / n
+        margin_of_error = self.z_alpha_half / (2 * (n ** 0.5))
+        return p_hat - margin_of_error, p_hat + margin_of_error
+
 
 if __name__ == "__main__":
     # Example usage
@@ -67,3 +137,7 @@ if __name__ == "__main__":
     # If you need a callable for some reason
     confidence_interval_function = ci_calculator.calculate
     print(confidence_interval_function(p_hat_example, N_example))
+
+    # Intervals of every count 0, ..., N at once
+    lower_table, upper_table = ci_calculator.interval_table(N_example)
+    print(lower_table[50], upper_table[50])
@@ -1,6 +1,10 @@
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Callable, List, Tuple
 
-from scipy.stats import norm
+import numpy as np
+
+from confidence_intervals.acceptance_index import register_per_count_method
+from confidence_intervals.confidence_interval import BaseConfidenceIntervalCalculator, ConfidenceIntervalCalculator
 
 
 def multinomial_confidence_intervals(x: List[int], alpha: float = 0.05) -> List[Tuple[float, float]]:
@@ -15,21 +19,59 @@ def multinomial_confidence_intervals(x: List[int], alpha: float = 0.05) -> List[
     each probability.
     """
     n = sum(x)  # Total count
-    z_alpha_half = norm.ppf(1 - alpha / 2)
+    lower_bounds, upper_bounds = fitzpatrick_scott_count_intervals(n, len(x), alpha)
 
-    confidence_intervals: List[Tuple[float, float]] = []
-    for count in x:
-        p_hat = count / n  # MLE of probability
-        margin_of_error = z_alpha_half / (2 * (n ** 0.5))
+    confidence_intervals: List[Tuple[float, float]] = [(lower_bounds[count], upper_bounds[count]) for count in x]
+    return confidence_intervals
 
-        lower_bound = max(p_hat - margin_of_error, 0)  # Ensure that probability is not negative
-        upper_bound = min(p_hat + margin_of_error, 1)  # Ensure that probability does not exceed 1
 
-        confidence_intervals.append((lower_bound, upper_bound))
+@lru_cache(maxsize=64)
+def fitzpatrick_scott_count_intervals(n: int, k: int, alpha: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tabulates the intervals of multinomial_confidence_intervals for every count 0, ..., n.
 
-    return confidence_intervals
+    The interval of a category depends only on its own count and on n, so multinomial_confidence_intervals reads
+    its intervals from this table. The bounds are those of ConfidenceIntervalCalculator, clipped to [0, 1].
+
+    Parameters:
+        n (int): Total count.
+        k (int): Number of categories (unused by this method).
+        alpha (float): Significance level.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Lower and upper bounds indexed by count, each of length n + 1.
+    """
+    lower_bounds, upper_bounds = ConfidenceIntervalCalculator(alpha).interval_table(n)
+
+    lower_bounds = np.maximum(lower_bounds, 0)  # Ensure that probability is not negative
+    upper_bounds = np.minimum(upper_bounds, 1)  # Ensure that probability does not exceed 1
+    lower_bounds.flags.writeable = False
+    upper_bounds.flags.writeable = False
+    return lower_bounds, upper_bounds
 
 
+register_per_count_method(multinomial_confidence_intervals, fitzpatrick_scott_count_intervals)
+
+
+def multinomial_method(
+        confidence_interval_calculator: BaseConfidenceIntervalCalculator,
+        K: int = None
+) -> Callable[[List[int]], List[Tuple[float, float]]]:
+    """
+    Returns the multinomial interval method whose coverage is analysed with the endpoints of a calculator.
+
+    Calculators of simultaneous methods (Goodman, Quesenberry and Hurst, Sison and Glaz) carry their method in a
+    `multinomial_confidence_interval` attribute and are built for a number of categories `k`; any other calculator
+    is analysed with multinomial_confidence_intervals.
+
+    Raises:
+        ValueError: If the calculator was built for a number of categories other than K.
+    """
+    k = getattr(confidence_interval_calculator, 'k', None)
+    if K is not None and k is not None and k != K:
+        raise ValueError(f"{confidence_interval_calculator.__name__} was built for k = {k}, not K = {K}.")
+    return getattr(confidence_interval_calculator, 'multinomial_confidence_interval', multinomial_confidence_intervals)
+
 # Example usage:
 if __name__ == "__main__":
     counts = [100, 200, 700]  # Example counts for three categories
@@ -39,3 +81,6 @@ if __name__ == "__main__":
     print("Confidence Intervals for each category:")
     for i, (lower, upper) in enumerate(results):
         print(f"Category {i + 1}: ({lower:.4f}, {upper:.4f})")
+
+    lower_table, upper_table = fitzpatrick_scott_count_intervals(sum(counts), len(counts), risk)
+    print("Tabulated interval for count 100:", (lower_table[100], upper_table[100]))
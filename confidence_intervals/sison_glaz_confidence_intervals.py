@@ -0,0 +1,175 @@
+from functools import lru_cache, partial
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from confidence_intervals.confidence_interval import BaseConfidenceIntervalCalculator
+from coverage_probability.multinomial_log_pmf import log_factorial_table
+from coverage_probability.rectangle_probability import rectangle_probability
+
+
+def sorted_count_vectors(n: int, k: int, largest: int = None) -> Iterator[Tuple[int, ...]]:
+    """Yields the count vectors of k categories summing to n with non-increasing counts, each exactly once."""
+    largest = n if largest is None else largest
+    if k == 1:
+        if n <= largest:
+            yield n,
+        return
+
+    for first in range(min(n, largest), (n + k - 1) // k - 1, -1):
+        for rest in sorted_count_vectors(n - first, k - 1, first):
+            yield (first,) + rest
+
+
+def window_probability(counts: Tuple[int, ...], c: int, log_factorials: np.ndarray = None) -> float:
+    """
+    Computes nu(c) = P(x_i - c <= X_i <= x_i + c for every i) for X ~ Multinomial(n, x / n), exactly, with
+    rectangle_probability.
+    """
+    n = sum(counts)
+    x = np.asarray(counts)
+    values = np.arange(n + 1)
+    admissible = (x[:, None] - c <= values[None, :]) & (values[None, :] <= x[:, None] + c)
+    return rectangle_probability(n, x / n, admissible, log_factorials)
+
+
+def sison_glaz_parameters_of(counts: Tuple[int, ...], alpha: float = 0.05,
+                             log_factorials: np.ndarray = None) -> Tuple[int, float]:
+    """
+    Finds the Sison and Glaz parameters (c, gamma) of a count vector: nu(c) < 1 - alpha <= nu(c + 1) and
+    gamma = (1 - alpha - nu(c)) / (nu(c + 1) - nu(c)).
+
+    nu is non-decreasing in c and reaches 1 at c = n, so c + 1 is found by binary search. When nu(0) already reaches
+    1 - alpha, c = 0 and gamma = 0.
+    """
+    n = sum(counts)
+    target = 1 - alpha
+    nu = {0: window_probability(counts, 0, log_factorials), n: 1.}
+    if nu[0] >= target:
+        return 0, 0.
+
+    # Invariant: nu(low) < target <= nu(high)
+    low, high = 0, n
+    while high - low > 1:
+        middle = (low + high) // 2
+        nu[middle] = window_probability(counts, middle, log_factorials)
+        if nu[middle] < target:
+            low = middle
+        else:
+            high = middle
+
+    return low, (target - nu[low]) / (nu[high] - nu[low])
+
+
+@lru_cache(maxsize=16)
+def sison_glaz_parameters(n: int, k: int, alpha: float = 0.05) -> Dict[Tuple[int, ...], Tuple[int, float]]:
+    """
+    Tabulates the Sison and Glaz parameters (c, gamma) of every outcome of n trials over k categories.
+
+    The parameters only depend on the multiset of counts, so they are computed once per non-increasing count vector.
+    nu(c) is computed exactly with rectangle_probability rather than with the Edgeworth approximation of the original
+    paper.
+
+    Parameters:
+        n (int): Total count.
+        k (int): Number of categories.
+        alpha (float): Significance level.
+
+    Returns:
+        Dict[Tuple[int, ...], Tuple[int, float]]: Parameters keyed by the counts sorted in non-increasing order.
+    """
+    log_factorials = log_factorial_table(n)
+    return {counts: sison_glaz_parameters_of(counts, alpha, log_factorials) for counts in sorted_count_vectors(n, k)}
+
+
+def sison_glaz_confidence_intervals(x: List[int], alpha: float = 0.05) -> List[Tuple[float, float]]:
+    """
+    Calculates Sison and Glaz's simultaneous confidence intervals for the probabilities of a multinomial
+    distribution, [x_i / n - c / n, x_i / n + (c + 2 gamma) / n] clipped to [0, 1].
+
+    The parameters come from the table of sison_glaz_parameters, so calling this for every outcome costs one lookup
+    per outcome.
+
+    Parameters:
+        x (List[int]): List of counts for each category.
+        alpha (float): Significance level for the confidence intervals, default is 0.05 for 95% confidence.
+
+    Returns: List[Tuple[float, float]]: Each tuple contains the lower and upper bounds of the confidence interval for
+    each probability.
+    """
+    n = sum(x)
+    c, gamma = sison_glaz_parameters(n, len(x), alpha)[tuple(sorted(x, reverse=True))]
+
+    confidence_intervals: List[Tuple[float, float]] = []
+    for count in x:
+        p_hat = count / n  # MLE of probability
+        lower_bound = max(p_hat - c / n, 0.)  # Ensure that probability is not negative
+        upper_bound = min(p_hat + (c + 2 * gamma) / n, 1.)  # Ensure that probability does not exceed 1
+        confidence_intervals.append((lower_bound, upper_bound))
+
+    return confidence_intervals
+
+
+class SisonGlazConfidenceIntervalCalculator(BaseConfidenceIntervalCalculator):
+    def __init__(self, k: int, alpha: float = 0.05):
+        """
+        Initializes the calculator of Sison and Glaz's simultaneous intervals for k categories.
+
+        The interval of a category depends on the whole count vector, so calculate returns the hull of the intervals
+        a count receives over all outcomes, and endpoints returns the endpoints of every outcome.
+        """
+        super().__init__(alpha)
+        self.__name__ = "Sison_and_Glaz"  # Assigning a name to the derived class
+        self.k = k
+        self.multinomial_confidence_interval = partial(sison_glaz_confidence_intervals, alpha=alpha)
+        self._offset_tables: Dict[Tuple[int, float], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def offset_table(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns, for every count 0, ..., n, the largest lower offset c and upper offset c + 2 gamma, in trials, that
+        the count receives over all outcomes of n trials. Memoised per (n, alpha).
+        """
+        key = (n, self.alpha)
+        if key not in self._offset_tables:
+            lower_offsets, upper_offsets = np.zeros(n + 1), np.zeros(n + 1)
+            for counts, (c, gamma) in sison_glaz_parameters(n, self.k, self.alpha).items():
+                counts = list(counts)
+                lower_offsets[counts] = np.maximum(lower_offsets[counts], c)
+                upper_offsets[counts] = np.maximum(upper_offsets[counts], c + 2 * gamma)
+            self._offset_tables[key] = lower_offsets, upper_offsets
+        return self._offset_tables[key]
+
+    def calculate(self, p_hat: float, n: int) -> Tuple[float, float]:
+        """
+        Calculates the hull of the confidence intervals a category with proportion p_hat receives.
+
+        Parameters:
+            p_hat (float): Sample proportion.
+            n (int): Sample size.
+
+        Returns:
+            Tuple[float, float]: Lower and upper bounds of the confidence interval.
+        """
+        lower_offsets, upper_offsets = self.offset_table(n)
+        count = round(p_hat * n)
+        return max(p_hat - lower_offsets[count] / n, 0.), min(p_hat + upper_offsets[count] / n, 1.)
+
+    def endpoints(self, n: int) -> np.ndarray:
+        """Returns the endpoints of the intervals of every count of every outcome of n trials."""
+        endpoints = set()
+        for counts, (c, gamma) in sison_glaz_parameters(n, self.k, self.alpha).items():
+            for count in set(counts):
+                p_hat = count / n
+                endpoints.add(max(p_hat - c / n, 0.))
+                endpoints.add(min(p_hat + (c + 2 * gamma) / n, 1.))
+        return np.array(sorted(endpoints))
+
+
+# Example usage:
+if __name__ == "__main__":
+    counts = [10, 20, 70]  # Example counts for three categories
+    risk = 0.05  # 95% confidence level
+
+    print("Parameters (c, gamma):", sison_glaz_parameters(sum(counts), len(counts), risk)[(70, 20, 10)])
+    for i, (lower, upper) in enumerate(sison_glaz_confidence_intervals(counts, risk)):
+        print(f"Category {i + 1}: ({lower:.4f}, {upper:.4f})")
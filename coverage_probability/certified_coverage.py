@@ -0,0 +1,150 @@
+import math
+from functools import lru_cache
+from typing import Callable, List, Tuple
+
+import numpy as np
+from mpmath import mp
+
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.coverage_probability import DEFAULT_CANDIDATE_TILE_SIZE, DEFAULT_OUTCOME_TILE_SIZE, \
+    _engine_index, add_work, outcome_intervals, outcome_table
+from coverage_probability.multinomial_log_pmf import log_factorial_table, safe_log_probabilities
+
+# Unit roundoff of float64
+UNIT_ROUNDOFF = 2. ** -53
+
+# Relative accuracy assumed for np.log, np.exp and scipy.special.gammaln, in units of the roundoff
+ELEMENTARY_FUNCTION_ULPS = 4
+
+# Decimal digits of the high-precision pass
+DEFAULT_DPS = 30
+
+
+@lru_cache(maxsize=16)
+def outcome_log_magnitudes(n: int, k: int) -> np.ndarray:
+    """Returns log(n!) + sum(log(x_i!)) for every outcome of outcome_table, which bounds |log coefficient|."""
+    outcomes, _ = outcome_table(n, k)
+    log_factorials = log_factorial_table(n)
+    return log_factorials[n] + log_factorials[outcomes].sum(axis=1)
+
+
+def coverage_probabilities_with_error(
+        n: int,
+        candidates: np.ndarray,
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        candidate_tile_size: int = DEFAULT_CANDIDATE_TILE_SIZE,
+        outcome_tile_size: int = DEFAULT_OUTCOME_TILE_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Same as coverage_probabilities with the enumerate engine, but also returns a bound on the floating-point error of
+    each coverage probability.
+
+    The log-pmf of an outcome, log C(x) + sum(x_i log p_i), is off by at most delta = (k + 2 + 2 c) u (G + S), where
+    G = log(n!) + sum(log(x_i!)), S = -sum(x_i log p_i) >= 0, u is the unit roundoff and c the accuracy, in units of
+    u, of log, exp and gammaln. Its exponential is then off by a relative expm1(delta) + c u, and summing the M terms
+    of a candidate adds at most M u times the sum. The bound is first order in u and inflated by 1 % to cover the
+    higher-order terms. Which outcomes are covered is decided by exact comparisons and adds no error.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (M,) coverage probabilities and their (M,) error bounds.
+    """
+    candidates = np.asarray(candidates, dtype=np.float64)
+    m, d = candidates.shape
+    index = _engine_index('enumerate', multinomial_confidence_interval, n, d + 1)
+
+    outcomes, log_coefficients = outcome_table(n, d + 1)
+    log_magnitudes = outcome_log_magnitudes(n, d + 1)
+    if index is None:
+        lower, upper = outcome_intervals(n, d + 1, multinomial_confidence_interval)
+        lower, upper = lower[:, :d], upper[:, :d]
+    counts = outcomes.astype(np.float64)
+    u, c = UNIT_ROUNDOFF, ELEMENTARY_FUNCTION_ULPS
+
+    coverage = np.zeros(m, dtype=np.float64)
+    error = np.zeros(m, dtype=np.float64)
+    for start in range(0, m, candidate_tile_size):
+        p = candidates[start:start + candidate_tile_size]
+        p_full = np.hstack([p, np.maximum(1 - p.sum(axis=1, keepdims=True), 0.)])
+        log_p = safe_log_probabilities(p_full)
+        # A zero probability adds no error: its outcomes have pmf exactly 0 or a factor 0 * LOG_ZERO = 0
+        abs_log_p = np.where(p_full > 0, -log_p, 0.)
+
+        for outcome_start in range(0, len(outcomes), outcome_tile_size):
+            tile = slice(outcome_start, outcome_start + outcome_tile_size)
+            if index is not None:
+                covered = index.covers(outcomes[tile, :d], p)
+            else:
+                covered = np.all(
+                    (lower[None, tile] <= p[:, None, :]) & (p[:, None, :] <= upper[None, tile]), axis=2
+                )
+            log_pmf = log_coefficients[None, tile] + log_p @ counts[tile].T
+            add_work("pmf_evaluations", log_pmf.size)
+            terms = np.where(covered, np.exp(log_pmf), 0.)
+
+            delta = (d + 3 + 2 * c) * u * (log_magnitudes[None, tile] + abs_log_p @ counts[tile].T)
+            coverage[start:start + len(p)] += terms.sum(axis=1)
+            error[start:start + len(p)] += (terms * (np.expm1(delta) + c * u)).sum(axis=1)
+
+    error += len(outcomes) * u * coverage
+    return coverage, 1.01 * error
+
+
+@lru_cache(maxsize=4)
+def outcome_coefficients(n: int, k: int) -> List[int]:
+    """Returns the exact multinomial coefficient of every outcome of outcome_table, as Python integers."""
+    outcomes, _ = outcome_table(n, k)
+    factorials = [math.factorial(i) for i in range(n + 1)]
+    return [factorials[n] // math.prod(factorials[x] for x in row) for row in outcomes.tolist()]
+
+
+def high_precision_coverage_probability(
+        n: int,
+        p: List[float],
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        dps: int = DEFAULT_DPS
+) -> Tuple[float, float]:
+    """
+    Re-evaluates the coverage probability of one candidate with mpmath at dps decimal digits.
+
+    The candidate is completed and the covered outcomes are chosen exactly as in coverage_probabilities_with_error;
+    only the summation of the pmf is done in high precision, with exact integer coefficients.
+
+    Returns:
+        Tuple[float, float]: The coverage probability, rounded to float64, and a bound on its error, which includes
+        the final rounding.
+    """
+    p = np.asarray(p, dtype=np.float64)[None, :]
+    d = p.shape[1]
+    p_full = np.hstack([p, np.maximum(1 - p.sum(axis=1, keepdims=True), 0.)])[0]
+
+    outcomes, _ = outcome_table(n, d + 1)
+    index = _engine_index('enumerate', multinomial_confidence_interval, n, d + 1)
+    if index is not None:
+        covered = index.covers(outcomes[:, :d], p[0])
+    else:
+        lower, upper = outcome_intervals(n, d + 1, multinomial_confidence_interval)
+        covered = np.all((lower[:, :d] <= p) & (p <= upper[:, :d]), axis=1)
+
+    coefficients = outcome_coefficients(n, d + 1)
+    add_work("pmf_evaluations", covered.sum())
+    with mp.workdps(dps):
+        probabilities = [mp.mpf(float(value)) for value in p_full]
+        value = mp.fsum(
+            coefficients[j] * mp.fprod(probabilities[i] ** x for i, x in enumerate(outcome) if x)
+            for j, outcome in zip(np.flatnonzero(covered).tolist(), outcomes[covered].tolist())
+        )
+        rounded = float(value)
+        # Each term carries at most 2 n + k + 2 roundings of relative size 10^(1 - dps) (binary powering, product and
+        # coefficient), and the sum is at most 1
+        error = float((2 * n + d + 3) * mp.mpf(10) ** (1 - dps) + abs(value - rounded))
+
+    return rounded, error
+
+
+if __name__ == '__main__':
+    # Example usage
+    candidates_ = np.array([[0.2, 0.5], [0.3, 0.3], [0.4210805856, 0.4210805856]])
+    coverage_, error_ = coverage_probabilities_with_error(30, candidates_, multinomial_confidence_intervals)
+    for candidate_, value_, bound_ in zip(candidates_.tolist(), coverage_, error_):
+        print(candidate_, value_, "+/-", bound_,
+              high_precision_coverage_probability(30, candidate_, multinomial_confidence_intervals))
@@ -1,8 +1,49 @@
 import math
-from itertools import product
-from typing import List, Tuple, Callable
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple, Callable
 
+import numpy as np
+
+from confidence_intervals.acceptance_index import acceptance_index
 from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.enumerate_compositions import composition_matrix, enumerate_compositions
+from coverage_probability.multinomial_log_pmf import complete_probability_vector, log_factorial_table, multinomial_pmf, \
+    safe_log_probabilities
+from coverage_probability.rectangle_probability import rectangle_probability
+
+# Coverage engines: walk the outcome space, or compute P(a_i <= X_i <= b_i) with conditional binomials
+ENGINES = ('enumerate', 'rectangle')
+
+# Number of candidates and outcomes multiplied together in one tile of the batched engine
+DEFAULT_CANDIDATE_TILE_SIZE = 256
+DEFAULT_OUTCOME_TILE_SIZE = 8192
+
+# Open work counters, see count_work
+_work_counters: List[Dict[str, int]] = []
+
+
+@contextmanager
+def count_work() -> Iterator[Dict[str, int]]:
+    """
+    Counts the work actually done by the coverage engines inside the block, in the current process.
+
+    The counters are outcomes_enumerated (outcomes generated, which excludes tables served from the cache),
+    pmf_evaluations ((candidate, outcome) pairs whose pmf was computed) and rectangle_evaluations (candidates evaluated
+    by rectangle_probability). Blocks may nest; each one sees the work done inside it.
+    """
+    counters: Dict[str, int] = {}
+    _work_counters.append(counters)
+    try:
+        yield counters
+    finally:
+        _work_counters.remove(counters)
+
+
+def add_work(counter: str, value: int) -> None:
+    """Adds value to a counter of every open count_work block."""
+    for counters in _work_counters:
+        counters[counter] = counters.get(counter, 0) + int(value)
 
 
 def indicator(x: float, interval: Tuple[float, float]) -> bool:
@@ -19,33 +60,165 @@ def coverage_probability(
         n: int,
         p: List[float],
         multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
-        debug: bool = False
+        debug: bool = False,
+        engine: str = 'enumerate'
 ):
-    """Calculates the coverage probability."""
+    """
+    Calculates the coverage probability.
+
+    With engine='enumerate' every outcome is visited. With engine='rectangle' the coverage is computed as the
+    probability of the admissible count ranges (see rectangle_probability), which is polynomial in K and n but
+    requires a per-count interval method.
+    """
     d = len(p)
+    p_full = complete_probability_vector(p)
+    log_factorials = log_factorial_table(n)
+    index = _engine_index(engine, multinomial_confidence_interval, n, d + 1)
+
+    if engine == 'rectangle':
+        add_work("rectangle_evaluations", 1)
+        return rectangle_probability(n, p_full, index.masks(p_full[:d]), log_factorials)
+
     coverage_prob = 0.
 
-    # Generate all possible combinations of x1, x2, ..., xd
-    for x in product(range(n + 1), repeat=(d + 1)):
-        if sum(x) == n:
-            if debug:
+    # Walk only the outcomes (x1, x2, ..., xd+1) that sum to n
+    for chunk in enumerate_compositions(n, d + 1):
+        if debug:
+            for x in map(tuple, chunk.tolist()):
                 print(x)
 
-            # Calculate the confidence intervals
-            intervals = multinomial_confidence_interval(x)
+        if index is not None:
+            # Per-count intervals: compare the counts with the admissible ranges of p
+            covered = index.covers(chunk[:, :d], p_full[:d])
+        else:
+            covered = np.zeros(len(chunk), dtype=bool)
+            for row, x in enumerate(map(tuple, chunk.tolist())):
+                # Calculate the confidence intervals
+                intervals = multinomial_confidence_interval(x)
+                covered[row] = all(indicator(p[i], intervals[i]) for i in range(d))
 
-            if all(indicator(p[i], intervals[i]) for i in range(d)):
-                # Calculate the multinomial coefficient
-                multinom_coeff = multinomial_coefficient(n, x)
-                # print(multinom_coeff)
+        # Sum the multinomial probabilities of the covered outcomes in log space
+        add_work("outcomes_enumerated", len(chunk))
+        add_work("pmf_evaluations", covered.sum())
+        coverage_prob += multinomial_pmf(chunk[covered], p_full, log_factorials).sum()
 
-                # Calculate the product of p1^x1 * p2^x2 * ... * pd^xd
-                prob_product = math.prod(p[i] ** x[i] for i in range(d)) * ((1 - sum(p)) ** x[d])
+    return float(coverage_prob)
 
-                # Update the coverage probability sum
-                coverage_prob += multinom_coeff * prob_product
 
-    return coverage_prob
+def _engine_index(
+        engine: str,
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        n: int,
+        k: int
+):
+    """Validates the engine name and returns the acceptance index of the method, if any."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown coverage engine '{engine}'; expected one of {ENGINES}.")
+
+    index = acceptance_index(multinomial_confidence_interval, n, k)
+    if engine == 'rectangle' and index is None:
+        raise ValueError("The rectangle engine requires an interval method registered as per-count.")
+    return index
+
+
+@lru_cache(maxsize=16)
+def outcome_table(n: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Enumerates the outcome space once, together with the log multinomial coefficient of each outcome.
+
+    Parameters:
+        n (int): Number of trials.
+        k (int): Number of categories.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (M, k) outcomes and their (M,) log multinomial coefficients.
+    """
+    outcomes = composition_matrix(n, k)
+    add_work("outcomes_enumerated", len(outcomes))
+    log_factorials = log_factorial_table(n)
+    log_coefficients = log_factorials[n] - log_factorials[outcomes].sum(axis=1)
+    return outcomes, log_coefficients
+
+
+@lru_cache(maxsize=16)
+def outcome_intervals(
+        n: int,
+        k: int,
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Computes the (M, k) lower and upper bounds of the confidence intervals of every outcome of outcome_table."""
+    outcomes, _ = outcome_table(n, k)
+    intervals = np.array([multinomial_confidence_interval(x) for x in map(tuple, outcomes.tolist())],
+                         dtype=np.float64).reshape(len(outcomes), k, 2)
+    return intervals[:, :, 0], intervals[:, :, 1]
+
+
+def coverage_probabilities(
+        n: int,
+        candidates: np.ndarray,
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        candidate_tile_size: int = DEFAULT_CANDIDATE_TILE_SIZE,
+        outcome_tile_size: int = DEFAULT_OUTCOME_TILE_SIZE,
+        engine: str = 'enumerate'
+) -> np.ndarray:
+    """
+    Calculates the coverage probability of many candidates at once.
+
+    The outcome space and its confidence intervals are computed once (see outcome_table), and the candidates are then
+    processed in (candidate_tile_size x outcome_tile_size) tiles: one boolean acceptance mask and one matrix product
+    of log-probabilities with outcome counts per tile. For per-count interval methods the acceptance mask is built
+    from the admissible count ranges of the candidates instead of the intervals of the outcomes. With
+    engine='rectangle' no outcome is enumerated and each candidate goes through rectangle_probability.
+
+    Parameters:
+        n (int): Number of trials.
+        candidates (np.ndarray): Array of shape (M, K-1); the last coordinate of each candidate is implied.
+        multinomial_confidence_interval (Callable): Function computing the intervals of an outcome.
+        candidate_tile_size (int): Number of candidates per tile.
+        outcome_tile_size (int): Number of outcomes per tile.
+        engine (str): 'enumerate' or 'rectangle'.
+
+    Returns:
+        np.ndarray: Array of shape (M,) with the coverage probability of each candidate.
+    """
+    candidates = np.asarray(candidates, dtype=np.float64)
+    m, d = candidates.shape
+    index = _engine_index(engine, multinomial_confidence_interval, n, d + 1)
+
+    if engine == 'rectangle':
+        log_factorials = log_factorial_table(n)
+        p_last = np.maximum(1 - candidates.sum(axis=1, keepdims=True), 0.)
+        add_work("rectangle_evaluations", m)
+        return np.array([
+            rectangle_probability(n, p, index.masks(p[:d]), log_factorials)
+            for p in np.hstack([candidates, p_last])
+        ])
+
+    outcomes, log_coefficients = outcome_table(n, d + 1)
+    if index is None:
+        lower, upper = outcome_intervals(n, d + 1, multinomial_confidence_interval)
+        lower, upper = lower[:, :d], upper[:, :d]
+    counts = outcomes.astype(np.float64)
+
+    coverage = np.zeros(m, dtype=np.float64)
+    for start in range(0, m, candidate_tile_size):
+        p = candidates[start:start + candidate_tile_size]
+        p_last = np.maximum(1 - p.sum(axis=1, keepdims=True), 0.)
+        log_p = safe_log_probabilities(np.hstack([p, p_last]))
+
+        for outcome_start in range(0, len(outcomes), outcome_tile_size):
+            tile = slice(outcome_start, outcome_start + outcome_tile_size)
+            if index is not None:
+                covered = index.covers(outcomes[tile, :d], p)
+            else:
+                covered = np.all(
+                    (lower[None, tile] <= p[:, None, :]) & (p[:, None, :] <= upper[None, tile]), axis=2
+                )
+            log_pmf = log_coefficients[None, tile] + log_p @ counts[tile].T
+            add_work("pmf_evaluations", log_pmf.size)
+            coverage[start:start + len(p)] += np.where(covered, np.exp(log_pmf), 0.).sum(axis=1)
+
+    return coverage
 
 
 if __name__ == '__main__':
@@ -55,3 +228,5 @@ if __name__ == '__main__':
     multinomial_confidence_intervals_ = multinomial_confidence_intervals
 
     print(coverage_probability(n_, p_, multinomial_confidence_intervals_, debug=True))
+    print(coverage_probabilities(n_, np.array([p_, [0.3, 0.3]]), multinomial_confidence_intervals_))
+    print(coverage_probability(n_, p_, multinomial_confidence_intervals_, engine='rectangle'))
@@ -0,0 +1,70 @@
+from typing import Iterator, List
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def enumerate_compositions(n: int, k: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """
+    Enumerates the compositions of n into k non-negative parts, i.e. every outcome (x1, ..., xk) of a multinomial
+    experiment with n trials, in lexicographic order.
+
+    Only the leading k-2 coordinates are walked in Python; the last two coordinates of each prefix are laid out as a
+    block of rows at once, so no tuple whose sum differs from n is ever produced.
+
+    Parameters:
+        n (int): Number of trials.
+        k (int): Number of categories.
+        chunk_size (int): Approximate number of rows per yielded chunk.
+
+    Returns:
+        Iterator[np.ndarray]: Integer arrays of shape (M, k) whose rows sum to n.
+    """
+    if k == 1:
+        yield np.array([[n]], dtype=np.int64)
+        return
+
+    buffer: List[np.ndarray] = []
+    buffered_rows = 0
+    prefix = [0] * (k - 2)
+
+    def tail_block(remaining: int) -> np.ndarray:
+        block = np.empty((remaining + 1, k), dtype=np.int64)
+        block[:, :k - 2] = prefix
+        block[:, k - 2] = np.arange(remaining + 1)
+        block[:, k - 1] = remaining - block[:, k - 2]
+        return block
+
+    def walk(position: int, remaining: int) -> Iterator[np.ndarray]:
+        nonlocal buffered_rows
+        if position == k - 2:
+            block = tail_block(remaining)
+            buffer.append(block)
+            buffered_rows += len(block)
+            if buffered_rows >= chunk_size:
+                yield np.concatenate(buffer)
+                buffer.clear()
+                buffered_rows = 0
+            return
+
+        for value in range(remaining + 1):
+            prefix[position] = value
+            yield from walk(position + 1, remaining - value)
+
+    yield from walk(0, n)
+
+    if buffer:
+        yield np.concatenate(buffer)
+
+
+def composition_matrix(n: int, k: int) -> np.ndarray:
+    """Returns all compositions of n into k parts as a single (M, k) integer array."""
+    return np.concatenate(list(enumerate_compositions(n, k)))
+
+
+if __name__ == '__main__':
+    # Example usage
+    for chunk in enumerate_compositions(4, 3, chunk_size=5):
+        print(chunk)
+    print(composition_matrix(200, 3).shape)
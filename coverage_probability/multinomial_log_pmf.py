@@ -0,0 +1,85 @@
+from typing import List, Sequence
+
+import numpy as np
+from scipy.special import gammaln, xlogy
+
+# Finite stand-in for log(0): multiplying it by a zero count gives 0 instead of nan, while any positive count still
+# drives the log-pmf far enough below zero that its exponential is exactly 0
+LOG_ZERO = -1e300
+
+# Table of log(k!) for k = 0, ..., len - 1, grown on demand and shared by every caller in the process
+_log_factorials: np.ndarray = np.zeros(1)
+
+
+def log_factorial_table(n: int) -> np.ndarray:
+    """
+    Returns the table [log(0!), log(1!), ..., log(n!)].
+
+    The table is computed once with lgamma(k + 1) and extended geometrically, so repeated calls for the same or a
+    smaller n only slice the cached array.
+
+    Parameters:
+        n (int): Largest argument needed.
+
+    Returns:
+        np.ndarray: Read-only array of length n + 1.
+    """
+    global _log_factorials
+    if n >= len(_log_factorials):
+        size = max(n + 1, 2 * len(_log_factorials))
+        _log_factorials = gammaln(np.arange(1, size + 1, dtype=np.float64))
+        _log_factorials.flags.writeable = False
+    return _log_factorials[:n + 1]
+
+
+def complete_probability_vector(p: Sequence[float]) -> np.ndarray:
+    """
+    Appends the implied last coordinate 1 - sum(p) to a candidate of size K-1.
+
+    Round-off can push the implied coordinate slightly below zero, in which case it is clipped to 0.
+    """
+    return np.array(list(p) + [max(1 - sum(p), 0.)], dtype=np.float64)
+
+
+def safe_log_probabilities(p: np.ndarray) -> np.ndarray:
+    """Returns log(p) elementwise, with LOG_ZERO in place of -inf so the result can enter a matrix product."""
+    p = np.asarray(p, dtype=np.float64)
+    positive = p > 0
+    return np.where(positive, np.log(np.where(positive, p, 1.)), LOG_ZERO)
+
+
+def multinomial_log_pmf(outcomes: np.ndarray, p: np.ndarray, log_factorials: np.ndarray = None) -> np.ndarray:
+    """
+    Evaluates the multinomial log-pmf for a batch of outcomes.
+
+    Parameters:
+        outcomes (np.ndarray): Integer array of shape (M, K) whose rows share the same sum n.
+        p (np.ndarray): Probability vector of size K.
+        log_factorials (np.ndarray): Optional table from log_factorial_table covering at least n.
+
+    Returns:
+        np.ndarray: Array of shape (M,) with log P(X = x) for each row x; -inf where the outcome is impossible.
+    """
+    outcomes = np.asarray(outcomes)
+    if len(outcomes) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    n = int(outcomes[0].sum())
+    if log_factorials is None:
+        log_factorials = log_factorial_table(n)
+
+    return log_factorials[n] - log_factorials[outcomes].sum(axis=1) + xlogy(outcomes, p).sum(axis=1)
+
+
+def multinomial_pmf(outcomes: np.ndarray, p: np.ndarray, log_factorials: np.ndarray = None) -> np.ndarray:
+    """Evaluates the multinomial pmf for a batch of outcomes, exponentiating the log-pmf only at the end."""
+    return np.exp(multinomial_log_pmf(outcomes, p, log_factorials))
+
+
+if __name__ == '__main__':
+    # Example usage
+    outcomes_: List[List[int]] = [[0, 0, 4], [1, 2, 1], [4, 0, 0]]
+    print(multinomial_pmf(np.array(outcomes_), np.array([0.2, 0.5, 0.3])))
+
+    # Stays finite where p ** x underflows
+    print(multinomial_log_pmf(np.array([[3000, 2000]]), np.array([0.6, 0.4])))
@@ -0,0 +1,65 @@
+import numpy as np
+from scipy.special import xlog1py, xlogy
+
+from coverage_probability.multinomial_log_pmf import log_factorial_table
+
+
+def rectangle_probability(n: int, p: np.ndarray, admissible: np.ndarray, log_factorials: np.ndarray = None) -> float:
+    """
+    Calculates P(X_i is admissible for i = 1, ..., d) for X ~ Multinomial(n, p) without enumerating the simplex.
+
+    The multinomial is factorised into conditional binomials, X_1 ~ Bin(n, p_1) and
+    X_j | X_1, ..., X_{j-1} ~ Bin(n - X_1 - ... - X_{j-1}, p_j / (p_j + ... + p_K)), and the distribution of the
+    number of remaining trials is propagated one category at a time, keeping only admissible counts. This costs
+    O(d n^2) instead of O(n^(K-1)).
+
+    Parameters:
+        n (int): Number of trials.
+        p (np.ndarray): Probability vector of size K.
+        admissible (np.ndarray): Boolean array of shape (d, n + 1), d <= K, marking the admissible counts of each of
+            the leading d categories; the remaining categories are unconstrained.
+        log_factorials (np.ndarray): Optional table from log_factorial_table covering at least n.
+
+    Returns:
+        float: The probability of the rectangle.
+    """
+    p = np.asarray(p, dtype=np.float64)
+    if log_factorials is None:
+        log_factorials = log_factorial_table(n)
+
+    # Tail masses p_j + ... + p_K, summed from the end to avoid cancellation in 1 - (p_1 + ... + p_{j-1})
+    tails = np.cumsum(p[::-1])[::-1]
+
+    # remaining[r] = P(r trials are left and every category so far had an admissible count)
+    remaining = np.zeros(n + 1, dtype=np.float64)
+    remaining[n] = 1.
+
+    for j in range(len(admissible)):
+        if j == len(p) - 1:
+            # The last category takes every remaining trial
+            remaining = np.where(admissible[j], remaining, 0.)
+            continue
+
+        q = min(p[j] / tails[j], 1.) if tails[j] > 0 else 0.
+        trials = np.flatnonzero(remaining)
+        counts = np.flatnonzero(admissible[j])
+        if len(trials) == 0 or len(counts) == 0:
+            return 0.
+
+        r, x = np.meshgrid(trials, counts, indexing='ij')
+        feasible = x <= r
+        r, x = r[feasible], x[feasible]
+
+        log_binomial = (log_factorials[r] - log_factorials[x] - log_factorials[r - x]
+                        + xlogy(x, q) + xlog1py(r - x, -q))
+        remaining = np.bincount(r - x, weights=remaining[r] * np.exp(log_binomial), minlength=n + 1)
+
+    return float(remaining.sum())
+
+
+if __name__ == '__main__':
+    # Example usage: P(1 <= X_1 <= 3, X_2 <= 2) for X ~ Multinomial(4, (0.2, 0.5, 0.3))
+    admissible_ = np.zeros((2, 5), dtype=bool)
+    admissible_[0, 1:4] = True
+    admissible_[1, :3] = True
+    print(rectangle_probability(4, np.array([0.2, 0.5, 0.3]), admissible_))
@@ -1,17 +1,29 @@
 from typing import List, Callable
 
-from final.filter_probability_vectors import filter_probability_vectors, filter_probability_vector
-from final.transform_to_probability_vector import transform_to_probability_vector
+import numpy as np
+
+from final.filter_probability_vectors import filter_probability_vector, condition_mask
+from final.transform_to_probability_vector import transform_to_probability_matrix
 
 
 def filter_candidates(
-        candidates: List[List[float]],
+        candidates: List[List[float]] | np.ndarray,
         condition: Callable[[List[float]], bool] = filter_probability_vector
-) -> List[List[float]]:
-    full_candidates = [transform_to_probability_vector(c) for c in candidates]
-    filtered_candidates = filter_probability_vectors(full_candidates, condition)
-    cropped_candidates = [c[:-1] for c in filtered_candidates]
-    return cropped_candidates
+) -> List[List[float]] | np.ndarray:
+    """
+    Keeps the candidates whose full probability vector satisfies the condition.
+
+    All candidates are completed into probability vectors at once and the condition is evaluated as a single mask,
+    in one vectorized pass for conditions built by vectorized_condition. The result has the type of the input: an array
+    of the kept rows, or a list of the kept candidates.
+    """
+    if len(candidates) == 0:
+        return candidates
+
+    mask = condition_mask(transform_to_probability_matrix(candidates), condition)
+    if isinstance(candidates, np.ndarray):
+        return candidates[mask]
+    return [c for c, keep in zip(candidates, mask) if keep]
 
 
 # Example usage
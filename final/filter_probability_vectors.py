@@ -1,5 +1,7 @@
 from typing import List, Callable
 
+import numpy as np
+
 
 # Define a condition where at least one element should be greater than a certain threshold
 def filter_probability_vector(v: List[float], threshold: float = 0.5) -> bool:
@@ -37,6 +39,60 @@ def filter_probability_vectors(
     return filtered_vectors
 
 
+def max_probability_batch(prob_matrix: np.ndarray) -> np.ndarray:
+    """Returns the largest element of each row, the quantity compared by filter_probability_vector."""
+    return np.asarray(prob_matrix).max(axis=1)
+
+
+def filter_probability_vector_batch(prob_matrix: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """Batch counterpart of filter_probability_vector: a boolean mask of the rows with an element above threshold."""
+    return np.any(np.asarray(prob_matrix) > threshold, axis=1)
+
+
+def vectorized_condition(
+        batch_function: Callable[..., np.ndarray],
+        name: str = None,
+        **kwargs
+) -> Callable[[List[float]], bool]:
+    """
+    Builds a condition from a batch predicate such as filter_probability_vector_batch.
+
+    The result can be called on a single probability vector like any other condition, and also exposes the batch
+    predicate as its `batch` attribute, which condition_mask uses to filter a whole matrix in one pass.
+
+    Parameters:
+        batch_function (Callable): Predicate taking an (M, K) matrix and returning a boolean mask of length M.
+        name (str): Name recorded for the condition, defaults to the name of the batch predicate.
+        **kwargs: Keyword arguments bound to the batch predicate, e.g. threshold.
+
+    Returns:
+        Callable[[List[float]], bool]: The condition.
+    """
+    def condition(v: List[float]) -> bool:
+        return bool(batch_function(np.asarray([v], dtype=np.float64), **kwargs)[0])
+
+    condition.batch = lambda prob_matrix: batch_function(prob_matrix, **kwargs)
+    condition.__name__ = name or batch_function.__name__
+    return condition
+
+
+def condition_mask(prob_matrix: np.ndarray, condition: Callable[[List[float]], bool]) -> np.ndarray:
+    """
+    Evaluates a condition on every row of an (M, K) matrix of probability vectors.
+
+    Uses the batch predicate of conditions built by vectorized_condition, and falls back to calling the condition on
+    each row as a list otherwise.
+    """
+    prob_matrix = np.asarray(prob_matrix, dtype=np.float64)
+    batch = getattr(condition, 'batch', None)
+    if batch is not None:
+        return np.asarray(batch(prob_matrix), dtype=bool).reshape(len(prob_matrix))
+    return np.array([condition(vector) for vector in prob_matrix.tolist()], dtype=bool).reshape(len(prob_matrix))
+
+
+filter_probability_vector.batch = filter_probability_vector_batch
+
+
 # Example usage
 if __name__ == "__main__":
     # List of probability vectors
@@ -55,3 +111,6 @@ if __name__ == "__main__":
     print("Filtered Probability Vectors:")
     for vec in filtered_vectors_:
         print(vec)
+
+    # Filtering the whole matrix in one pass
+    print(condition_mask(np.array(probability_vectors), vectorized_condition(filter_probability_vector_batch)))
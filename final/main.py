@@ -8,7 +8,7 @@ from confidence_intervals.multinomial_confidence_intervals import multinomial_co
 from final.filter_candidates import filter_candidates
 from final.filter_probability_vectors import filter_probability_vector
 from final.transform_to_probability_vector import transform_to_probability_vector
-from find_minimizer.find_minimizer import find_minimizer
+from find_minimizer.find_minimizer import find_minimizer_batched
 
 
 def execute_analysis(
@@ -26,7 +26,7 @@ def execute_analysis(
     if condition:
         candidates = filter_candidates(candidates, condition)
 
-    min_value, minimizer = find_minimizer(N, candidates, multinomial_confidence_intervals)
+    min_value, minimizer = find_minimizer_batched(N, candidates, multinomial_confidence_intervals)
     end_time = time.time()  # End time measurement
     elapsed_time = end_time - start_time  # Calculate elapsed time
 
@@ -1,5 +1,7 @@
 from typing import List
 
+import numpy as np
+
 
 def transform_to_probability_vector(vector: List[float], precision: int = 10):
     """
@@ -20,9 +22,32 @@ def transform_to_probability_vector(vector: List[float], precision: int = 10):
     return probability_vector
 
 
+def transform_to_probability_matrix(vectors: np.ndarray, precision: int = 10) -> np.ndarray:
+    """
+    Transforms every row of an (M, K-1) array into a probability vector, like transform_to_probability_vector.
+
+    The row sums are accumulated left to right, as sum() does, before rounding the appended coordinate.
+
+    Parameters:
+        vectors (np.ndarray): Input vectors, one per row.
+        precision (int): Number of decimals kept in the appended coordinate.
+
+    Returns:
+        np.ndarray: Array of shape (M, K) of probability vectors.
+    """
+    vectors = np.asarray(vectors, dtype=np.float64).reshape(len(vectors), -1)
+    sum_of_coordinates = np.zeros(len(vectors))
+    for column in vectors.T:
+        sum_of_coordinates += column
+
+    appended_coordinate = np.round(1 - sum_of_coordinates, precision)
+    return np.hstack([vectors, appended_coordinate[:, None]])
+
+
 if __name__ == "__main__":
     # Example usage:
     input_vector = [0.2, 0.3, 0.4]  # Example input vector
     output_vector = transform_to_probability_vector(input_vector)
     print("Input Vector:", input_vector)
     print("Probability Vector:", output_vector)
+    print("Probability Matrix:", transform_to_probability_matrix(np.array([input_vector, [0.1, 0.1, 0.1]])))
@@ -0,0 +1,163 @@
+import heapq
+from itertools import count, product
+from typing import Callable, List, Tuple
+
+import numpy as np
+from scipy.stats import binom
+
+from confidence_intervals.acceptance_index import acceptance_index, AcceptanceIndex
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.coverage_probability import coverage_probabilities
+from final.transform_to_probability_vector import transform_to_probability_vector
+
+# Regions holding at most this many index tuples are evaluated exhaustively instead of being split further
+DEFAULT_LEAF_SIZE = 64
+
+
+def tighten_box(lower: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray] | None:
+    """
+    Shrinks an index box to the smallest box holding the same non-decreasing index tuples.
+
+    Returns None when the box holds no non-decreasing tuple.
+    """
+    lower, upper = np.maximum.accumulate(lower), np.minimum.accumulate(upper[::-1])[::-1]
+    if np.any(lower > upper):
+        return None
+    return lower, upper
+
+
+def coverage_lower_bounds(n: int, index: AcceptanceIndex, p_low: np.ndarray, p_high: np.ndarray) -> np.ndarray:
+    """
+    Lower bound on the coverage probability of every candidate p with p_low <= p <= p_high, for arrays of boxes of
+    shape (..., d). A box with p_low == p_high bounds a single candidate.
+
+    Every count in [a_i(p_high), b_i(p_low)] is admissible for the whole box, because the admissible range
+    [a_i(p), b_i(p)] moves up with p_i. By Bonferroni's inequality the coverage is therefore at least
+    1 - sum_i P(X_i < a_i(p_high)) - sum_i P(X_i > b_i(p_low)), and these binomial tails are largest at p_i = p_low_i and
+    p_i = p_high_i respectively.
+    """
+    first, _ = index.ranges(p_high)
+    _, last = index.ranges(p_low)
+    miss = binom.cdf(first - 1, n, p_low).sum(axis=-1) + binom.sf(last, n, p_high).sum(axis=-1)
+    return 1. - miss
+
+
+def _box_candidates(elements: List[float], lower: np.ndarray, upper: np.ndarray) -> List[List[float]]:
+    """Lists the candidates of generate_unique_matrix whose endpoint indices lie in the box."""
+    candidates = []
+    for indices in product(*(range(low, high + 1) for low, high in zip(lower, upper))):
+        if all(indices[i] <= indices[i + 1] for i in range(len(indices) - 1)):
+            candidate = [elements[i] for i in indices]
+            if sum(candidate) <= 1:
+                candidates.append(candidate)
+    return candidates
+
+
+def find_minimizer_branch_and_bound(
+        n: int,
+        k: int,
+        ranked_endpoints: List[float],
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        condition: Callable[[List[float]], bool] = None,
+        incumbent: Tuple[float, List[float]] = None,
+        leaf_size: int = DEFAULT_LEAF_SIZE,
+        engine: str = 'rectangle',
+        debug: bool = False
+) -> Tuple[float, List[float], int]:
+    """
+    Finds the minimum coverage probability over the candidates of generate_unique_matrix(k - 1, ranked_endpoints)
+    without evaluating all of them.
+
+    The candidates are the non-decreasing index tuples into ranked_endpoints whose endpoints sum to at most 1. Boxes of
+    index tuples are explored best-first: each box gets a cheap lower bound on the coverage of every candidate in it
+    (see coverage_lower_bounds), boxes whose bound cannot beat the incumbent are discarded, and the others are split
+    along their widest coordinate until they are small enough to be enumerated; the candidates of such a box are
+    bounded individually and only those that could beat the incumbent are evaluated exactly. The result is the same infimum as
+    find_minimizer on the full candidate list.
+
+    Parameters:
+        n (int): Number of trials.
+        k (int): Number of categories.
+        ranked_endpoints (List[float]): Sorted endpoints, as returned by rank_endpoints.
+        confidence_interval_function (Callable): Per-count multinomial interval method.
+        condition (Callable[[List[float]], bool]): Optional filter applied to the full probability vectors.
+        incumbent (Tuple[float, List[float]]): Optional known (coverage, candidate) pair to start pruning from.
+        leaf_size (int): Largest number of index tuples in a box evaluated exhaustively.
+        engine (str): Coverage engine used for exact evaluations, see coverage_probabilities.
+        debug (bool): Print search statistics.
+
+    Returns:
+        Tuple[float, List[float], int]: The minimum value, the minimizer and the number of candidates evaluated.
+    """
+    index = acceptance_index(confidence_interval_function, n, k)
+    if index is None or not index.contiguous:
+        raise ValueError("Branch and bound requires a per-count interval method with contiguous acceptance ranges.")
+
+    elements = np.asarray(ranked_endpoints, dtype=np.float64)
+    d = k - 1
+    min_value, minimizer = incumbent if incumbent is not None else (float('inf'), [])
+    evaluated, explored = 0, 0
+    heap, tie_breaker = [], count()
+
+    def push(lower: np.ndarray, upper: np.ndarray) -> None:
+        box = tighten_box(lower, upper)
+        if box is None or elements[box[0]].sum() > 1 + 1e-12:
+            return
+        bound = float(coverage_lower_bounds(n, index, elements[box[0]], elements[box[1]]))
+        if bound < min_value:
+            heapq.heappush(heap, (bound, next(tie_breaker), box[0], box[1]))
+
+    if len(elements) > 0:
+        push(np.zeros(d, dtype=np.int64), np.full(d, len(elements) - 1, dtype=np.int64))
+
+    while heap:
+        bound, _, lower, upper = heapq.heappop(heap)
+        if bound >= min_value:
+            break
+        explored += 1
+
+        widths = upper - lower + 1
+        if np.prod(widths) <= leaf_size:
+            candidates = _box_candidates(ranked_endpoints, lower, upper)
+            if condition:
+                candidates = [c for c in candidates if condition(transform_to_probability_vector(c))]
+
+            # Bound each candidate on its own before paying for an exact evaluation
+            points = np.array(candidates).reshape(len(candidates), d)
+            promising = np.flatnonzero(coverage_lower_bounds(n, index, points, points) < min_value)
+            if len(promising) == 0:
+                continue
+
+            candidates = [candidates[i] for i in promising]
+            coverage = coverage_probabilities(n, points[promising], confidence_interval_function, engine=engine)
+            evaluated += len(candidates)
+            best = int(np.argmin(coverage))
+            if coverage[best] < min_value:
+                min_value, minimizer = float(coverage[best]), candidates[best]
+            continue
+
+        axis = int(np.argmax(widths))
+        middle = (lower[axis] + upper[axis]) // 2
+        left_upper, right_lower = upper.copy(), lower.copy()
+        left_upper[axis], right_lower[axis] = middle, middle + 1
+        push(lower, left_upper)
+        push(right_lower, upper)
+
+    if debug:
+        print(f"Explored {explored} boxes and evaluated {evaluated} candidates")
+
+    return min_value, minimizer, evaluated
+
+
+if __name__ == '__main__':
+    # Example usage
+    from candidate_minimizers.rank_endpoints import rank_endpoints
+    from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator
+
+    n_example = 100
+    ranked_endpoints_ = rank_endpoints(n_example, ConfidenceIntervalCalculator())
+    min_value, minimizer, evaluated = find_minimizer_branch_and_bound(
+        n_example, 3, ranked_endpoints_, multinomial_confidence_intervals, debug=True
+    )
+    print(f"Minimum coverage probability: {min_value}")
+    print(f"Minimizing candidate: {minimizer}")
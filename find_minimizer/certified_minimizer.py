@@ -0,0 +1,82 @@
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix_chunks
+from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.certified_coverage import DEFAULT_DPS, coverage_probabilities_with_error, \
+    high_precision_coverage_probability
+
+
+def find_minimizer_certified_chunks(
+        n: int,
+        candidate_chunks: Iterable[np.ndarray],
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        dps: int = DEFAULT_DPS,
+        debug: bool = False
+) -> Tuple[float, List[float], float, int]:
+    """
+    Finds the minimum coverage probability with a certified error, at close to the cost of the float64 engine.
+
+    Every chunk goes through coverage_probabilities_with_error, and a candidate stays in contention while its lower
+    bound, coverage - error, does not exceed the smallest upper bound seen so far. Only the candidates still in
+    contention at the end, usually a handful, are re-evaluated with high_precision_coverage_probability, and the
+    minimum is taken over their high-precision values; ties go to the first candidate, as in find_minimizer.
+
+    Parameters:
+        n (int): Number of trials.
+        candidate_chunks (Iterable[np.ndarray]): Chunks of candidates of shape (M, K-1), in order.
+        multinomial_confidence_interval (Callable): Function computing the intervals of an outcome.
+        dps (int): Decimal digits of the high-precision pass.
+        debug (bool): Print the number of candidates in contention.
+
+    Returns:
+        Tuple[float, List[float], float, int]: The minimum value, the minimizer, a certified bound on the error of the
+        minimum value, and the number of candidates re-evaluated in high precision.
+    """
+    best_upper = float('inf')
+    contenders: List[Tuple[float, List[float]]] = []  # (lower bound, candidate), in order
+
+    for chunk in candidate_chunks:
+        if len(chunk) == 0:
+            continue
+
+        coverage, error = coverage_probabilities_with_error(n, chunk, multinomial_confidence_interval)
+        best_upper = min(best_upper, float((coverage + error).min()))
+        lower_bounds = coverage - error
+        kept = np.flatnonzero(lower_bounds <= best_upper)
+        contenders = [(lower, candidate) for lower, candidate in contenders if lower <= best_upper]
+        contenders.extend(zip(lower_bounds[kept].tolist(), np.asarray(chunk)[kept].tolist()))
+
+    if debug:
+        print(f"{len(contenders)} candidate(s) re-evaluated with {dps} digits")
+
+    min_value, minimizer, certified_error = float('inf'), [], float('inf')
+    for _, candidate in contenders:
+        value, error = high_precision_coverage_probability(n, candidate, multinomial_confidence_interval, dps)
+        if value < min_value:
+            min_value, minimizer, certified_error = value, candidate, error
+
+    return min_value, minimizer, certified_error, len(contenders)
+
+
+def find_minimizer_certified(
+        n: int,
+        candidates: List[List[float]],
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        dps: int = DEFAULT_DPS,
+        debug: bool = False
+) -> Tuple[float, List[float], float, int]:
+    """Same as find_minimizer_certified_chunks for a list or array of candidates."""
+    candidates = np.asarray(candidates, dtype=np.float64)
+    return find_minimizer_certified_chunks(n, [candidates], multinomial_confidence_interval, dps, debug)
+
+
+if __name__ == '__main__':
+    # Example usage
+    n_example = 40
+    ranked_endpoints_ = rank_endpoints(n_example, ConfidenceIntervalCalculator())
+    chunks_ = generate_unique_matrix_chunks(2, ranked_endpoints_)
+    print(find_minimizer_certified_chunks(n_example, chunks_, multinomial_confidence_intervals, debug=True))
@@ -0,0 +1,164 @@
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix_chunks
+from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from find_minimizer.find_minimizer import find_minimizer_batched
+
+# Number of completed chunks between two writes of the checkpoint
+DEFAULT_CHECKPOINT_EVERY = 1
+
+
+def load_checkpoint(checkpoint_path: str, fingerprint: Dict = None) -> Dict | None:
+    """
+    Reads a checkpoint written by find_minimizer_resumable.
+
+    Raises:
+        ValueError: If the checkpoint was written for a different run than the fingerprint describes.
+
+    Returns:
+        Dict | None: The checkpoint, or None when the file does not exist.
+    """
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    with open(checkpoint_path, 'r') as file:
+        checkpoint = json.load(file)
+
+    if fingerprint is not None and checkpoint.get("fingerprint") != fingerprint:
+        raise ValueError(f"{checkpoint_path} was written for {checkpoint.get('fingerprint')}, not {fingerprint}.")
+    return checkpoint
+
+
+def save_checkpoint(checkpoint_path: str, checkpoint: Dict) -> None:
+    """Writes the checkpoint atomically: a pre-empted write leaves the previous checkpoint intact."""
+    directory = os.path.dirname(os.path.abspath(checkpoint_path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.checkpoint-', suffix='.json')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(checkpoint, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, checkpoint_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def skip_completed_chunks(candidate_chunks: Iterable[np.ndarray], completed: Set[int]) -> Iterator[np.ndarray]:
+    """
+    Replaces the chunks whose IDs are in completed by empty chunks, so that the stages between generation and
+    find_minimizer_resumable, such as filtering, skip the work done before a pre-emption while the chunk IDs stay
+    aligned.
+    """
+    for chunk_id, chunk in enumerate(candidate_chunks):
+        yield chunk[:0] if chunk_id in completed else chunk
+
+
+def row_checkpoint_path(checkpoint_path: str, N: int, K: int, confidence_interval_function_name: str, alpha: float,
+                        condition_name: str) -> str:
+    """
+    Derives the checkpoint file of one (N, K, confidence interval function, alpha, condition) row from
+    checkpoint_path, e.g. 'run.json' -> 'run-N200-K3-Goodman-alpha0.05-Threshold=0.9.json', so that the rows of a
+    sweep never share a checkpoint.
+    """
+    root, extension = os.path.splitext(checkpoint_path)
+    parts = [f"N{N}", f"K{K}", confidence_interval_function_name, f"alpha{alpha}"]
+    parts += [condition_name] if condition_name else []
+    # Keep the file name portable: anything but letters, digits and '.=_-' becomes '_'
+    return root + "-" + re.sub(r'[^\w.=-]+', '_', "-".join(parts)) + (extension or '.json')
+
+
+def find_minimizer_resumable(
+        n: int,
+        candidate_chunks: Iterable[np.ndarray],
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        checkpoint_path: str,
+        fingerprint: Dict = None,
+        checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+        start_time: float = None,
+        debug: bool = False
+) -> Tuple[float, List[float], float]:
+    """
+    Same as find_minimizer_chunks, but resumable: the chunks are numbered in order, and the incumbent
+    (min_value, minimizer) and the IDs of the completed chunks are saved to checkpoint_path every checkpoint_every
+    chunks and at the end.
+
+    When the checkpoint exists, the incumbent is restored and the completed chunks are skipped, so a restarted run
+    redoes at most checkpoint_every chunks and returns the same answer as an uninterrupted one, ties included. The
+    chunks must be produced in the same order on every run, as generate_unique_matrix_chunks does for a fixed chunk
+    size; completed chunks can already be emptied upstream with skip_completed_chunks.
+
+    The checkpoint also accumulates the elapsed time of the run, measured from start_time (the time of the call by
+    default) to each write, and the time accumulated by earlier, interrupted runs is returned so that it can be added
+    to the elapsed time of the resumed one. Only the time between the last write and a pre-emption is lost.
+
+    Parameters:
+        n (int): Number of trials.
+        candidate_chunks (Iterable[np.ndarray]): Chunks of candidates of shape (M, K-1), in a reproducible order.
+        multinomial_confidence_interval (Callable): Function computing the intervals of an outcome.
+        checkpoint_path (str): Path of the JSON checkpoint.
+        fingerprint (Dict): JSON-serialisable description of the run (N, K, method, condition, chunk size, ...);
+            resuming from a checkpoint with another fingerprint raises ValueError.
+        checkpoint_every (int): Number of completed chunks between two writes.
+        start_time (float): time.time() at which this run started, so that its earlier stages are included in the
+            saved elapsed time; defaults to the time of the call.
+        debug (bool): Print progress.
+
+    Returns:
+        Tuple[float, List[float], float]: The minimum value, the minimizer, and the elapsed time of the earlier runs
+        (0 when nothing was resumed).
+    """
+    if start_time is None:
+        start_time = time.time()
+
+    checkpoint = load_checkpoint(checkpoint_path, fingerprint)
+    if checkpoint is None:
+        checkpoint = {"fingerprint": fingerprint, "min_value": float('inf'), "minimizer": [], "completed": []}
+    elif debug:
+        print(f"Resuming from {checkpoint_path}: {len(checkpoint['completed'])} chunk(s) already completed")
+    previous_elapsed_time = checkpoint.get("elapsed_time", 0.)
+
+    def save() -> None:
+        checkpoint["elapsed_time"] = previous_elapsed_time + time.time() - start_time
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    completed = set(checkpoint["completed"])
+    pending = 0
+    for chunk_id, chunk in enumerate(candidate_chunks):
+        if chunk_id in completed:
+            continue
+
+        if len(chunk):
+            value, candidate = find_minimizer_batched(n, chunk, multinomial_confidence_interval)
+            if value < checkpoint["min_value"]:
+                checkpoint["min_value"], checkpoint["minimizer"] = value, candidate
+
+        completed.add(chunk_id)
+        checkpoint["completed"].append(chunk_id)
+        pending += 1
+        if pending >= checkpoint_every:
+            save()
+            pending = 0
+            if debug:
+                print(f"Chunk {chunk_id} completed, minimum value = {checkpoint['min_value']}")
+
+    save()
+    return checkpoint["min_value"], checkpoint["minimizer"], previous_elapsed_time
+
+
+if __name__ == '__main__':
+    # Example usage: interrupt and rerun to resume
+    n_example = 60
+    ranked_endpoints_ = rank_endpoints(n_example, ConfidenceIntervalCalculator())
+    chunks_ = generate_unique_matrix_chunks(2, ranked_endpoints_, chunk_size=256)
+    print(find_minimizer_resumable(n_example, chunks_, multinomial_confidence_intervals, 'minimizer_checkpoint.json',
+                                   {"N": n_example, "K": 3, "chunk_size": 256}, debug=True))
@@ -0,0 +1,218 @@
+import math
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix_chunks
+from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.acceptance_index import acceptance_index
+from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.coverage_probability import add_work, coverage_probabilities
+from coverage_probability.multinomial_log_pmf import log_factorial_table, safe_log_probabilities
+
+# Radii of the shells around the mode, in units of sqrt(n) / 2, the largest standard deviation of a count
+DEFAULT_SHELL_RADII = (1., 1.5, 2., 2.5, 3.)
+
+# A candidate is abandoned once its partial sum exceeds the incumbent by this much, which absorbs the rounding of
+# summing in a different order than coverage_probabilities
+EARLY_EXIT_SLACK = 1e-10
+
+DEFAULT_EARLY_EXIT_TILE_SIZE = 64
+
+# Largest number of (candidate, outcome) pairs held in memory at once
+DEFAULT_EARLY_EXIT_MAX_PAIRS = 2 ** 18
+
+
+def _box_chunks(lower: np.ndarray, upper: np.ndarray, max_offsets: int) -> Iterator[np.ndarray]:
+    """Yields the integer points of the box lower <= o <= upper, in chunks of at most max_offsets rows."""
+    if np.any(lower > upper):
+        return
+    shape = tuple((upper - lower + 1).tolist())
+    size = math.prod(shape)
+    for start in range(0, size, max_offsets):
+        flat = np.arange(start, min(start + max_offsets, size))
+        yield np.stack(np.unravel_index(flat, shape), axis=1).astype(np.int64).reshape(-1, len(shape)) + lower
+
+
+def shell_offset_chunks(
+        lower: np.ndarray,
+        upper: np.ndarray,
+        inner: int | None,
+        outer: int,
+        max_offsets: int
+) -> Iterator[np.ndarray]:
+    """
+    Yields, in chunks of at most max_offsets rows, the integer offsets o of the shell inner < max|o| <= outer (the whole
+    box max|o| <= outer when inner is None) that also lie in the box lower <= o <= upper.
+
+    The shell is split into disjoint boxes, the j-th holding the offsets with |o_j| > inner and |o_i| <= inner for
+    i < j, so that only offsets inside both the shell and the clipping box are ever generated.
+    """
+    lower = np.maximum(np.asarray(lower, dtype=np.int64), -outer)
+    upper = np.minimum(np.asarray(upper, dtype=np.int64), outer)
+    if inner is None:
+        yield from _box_chunks(lower, upper, max_offsets)
+        return
+
+    for j in range(len(lower)):
+        for side_lower, side_upper in ((-outer, -inner - 1), (inner + 1, outer)):
+            box_lower, box_upper = lower.copy(), upper.copy()
+            box_lower[:j] = np.maximum(box_lower[:j], -inner)
+            box_upper[:j] = np.minimum(box_upper[:j], inner)
+            box_lower[j] = max(box_lower[j], side_lower)
+            box_upper[j] = min(box_upper[j], side_upper)
+            yield from _box_chunks(box_lower, box_upper, max_offsets)
+
+
+def find_minimizer_early_exit_chunks(
+        n: int,
+        candidate_chunks: Iterable[np.ndarray],
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        incumbent: Tuple[float, List[float]] = None,
+        shell_radii: Tuple[float, ...] = DEFAULT_SHELL_RADII,
+        tile_size: int = DEFAULT_EARLY_EXIT_TILE_SIZE,
+        max_pairs: int = DEFAULT_EARLY_EXIT_MAX_PAIRS,
+        engine: str = 'enumerate',
+        debug: bool = False
+) -> Tuple[float, List[float], float]:
+    """
+    Finds the minimum coverage probability, abandoning every candidate as soon as it provably cannot beat the
+    incumbent.
+
+    Coverage is a sum of non-negative terms, so a candidate whose partial sum already exceeds the incumbent is not
+    the minimizer. The covered outcomes of a tile of candidates are summed shell by shell, in order of distance from
+    each candidate's mode, where almost all of the probability lies; the candidates whose partial sum exceeds the
+    incumbent are dropped after each block of outcomes. Only the remaining candidates are evaluated in full, by
+    coverage_probabilities, so the minimizer is the same as that of find_minimizer_batched, including ties, and the
+    minimum value only differs by the rounding of a matrix product of a different shape.
+
+    The offsets of a shell are generated lazily (see shell_offset_chunks), clipped to those that lie in the outcome
+    space for at least one candidate of the tile, and processed in blocks of at most max_pairs (candidate, outcome)
+    pairs, so the pruning uses memory bounded by max_pairs whatever n and K. The survivors are evaluated with the
+    given coverage engine: 'enumerate', the default, holds the whole outcome table, while 'rectangle' keeps the
+    search within bounded memory, at the cost of values that differ from find_minimizer_batched by rounding.
+
+    Parameters:
+        n (int): Number of trials.
+        candidate_chunks (Iterable[np.ndarray]): Chunks of candidates of shape (M, K-1), in order.
+        multinomial_confidence_interval (Callable): Per-count multinomial interval method.
+        incumbent (Tuple[float, List[float]]): Optional known (coverage, candidate) to start pruning from.
+        shell_radii (Tuple[float, ...]): Increasing shell radii, in units of sqrt(n) / 2.
+        tile_size (int): Number of candidates summed together.
+        max_pairs (int): Largest number of (candidate, outcome) pairs evaluated in one block.
+        engine (str): Coverage engine of the full evaluations, see coverage_probabilities.
+        debug (bool): Print the fraction of the outcome space skipped.
+
+    Returns:
+        Tuple[float, List[float], float]: The minimum value, the minimizer, and the fraction of (candidate, outcome)
+        pairs that were never evaluated.
+    """
+    min_value, minimizer = incumbent if incumbent is not None else (float('inf'), [])
+    log_factorials = log_factorial_table(n)
+    radii = sorted({math.ceil(radius * math.sqrt(n) / 2) for radius in shell_radii})
+
+    total_pairs = 0
+    evaluated_pairs = 0
+    for chunk in candidate_chunks:
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if len(chunk) == 0:
+            continue
+
+        m, d = chunk.shape
+        index = acceptance_index(multinomial_confidence_interval, n, d + 1)
+        if index is None or not index.contiguous:
+            raise ValueError("Early exit requires a per-count interval method with contiguous admissible counts.")
+        outcomes = math.comb(n + d, d)
+        total_pairs += m * outcomes
+
+        for start in range(0, m, tile_size):
+            p = chunk[start:start + tile_size]
+            p_full = np.hstack([p, np.maximum(1 - p.sum(axis=1, keepdims=True), 0.)])
+            log_p = safe_log_probabilities(p_full)
+            first, last = index.ranges(p)
+            mode = np.floor(n * p + 0.5).astype(np.int64)
+
+            active = np.arange(len(p))
+            if min_value == float('inf'):
+                # Seed the incumbent with the first candidate
+                min_value, minimizer = float(coverage_probabilities(n, p[:1], multinomial_confidence_interval,
+                                                                    engine=engine)[0]), p[0].tolist()
+                evaluated_pairs += outcomes
+                active = active[1:]
+
+            partial_sums = np.zeros(len(p))
+            shell_pairs = np.zeros(len(p), dtype=np.int64)
+            inner = None
+            for outer in radii:
+                if len(active) == 0:
+                    break
+
+                # Offsets outside the outcome space of every active candidate are never generated
+                lower = -mode[active].max(axis=0)
+                upper = n - mode[active].min(axis=0)
+                max_last = n - mode[active].sum(axis=1).min()
+                for offsets in shell_offset_chunks(lower, upper, inner, outer, max(1, max_pairs // len(active))):
+                    offsets = offsets[offsets.sum(axis=1) <= max_last]
+                    if len(offsets) == 0 or len(active) == 0:
+                        continue
+
+                    # Outcomes of the block around the mode of each active candidate, shape (T, S, d)
+                    x = mode[active, None, :] + offsets[None, :, :]
+                    x_last = n - x.sum(axis=2)
+                    valid = np.all(x >= 0, axis=2) & (x_last >= 0)
+                    covered = valid & np.all((first[active, None, :] <= x) & (x <= last[active, None, :]), axis=2)
+
+                    x_full = np.concatenate([x, x_last[:, :, None]], axis=2)
+                    x_full = np.where(valid[:, :, None], x_full, 0)
+                    log_pmf = (log_factorials[n] - log_factorials[x_full].sum(axis=2)
+                               + np.einsum('tsk,tk->ts', x_full, log_p[active]))
+                    partial_sums[active] += np.exp(np.where(covered, log_pmf, -np.inf)).sum(axis=1)
+                    shell_pairs[active] += valid.sum(axis=1)
+                    add_work("pmf_evaluations", valid.sum())
+
+                    active = active[partial_sums[active] <= min_value + EARLY_EXIT_SLACK]
+                inner = outer
+
+            # The abandoned candidates were evaluated on their shells only, the survivors are evaluated in full below
+            abandoned = np.ones(len(p), dtype=bool)
+            abandoned[active] = False
+            evaluated_pairs += int(shell_pairs[abandoned].sum())
+            if len(active) == 0:
+                continue
+
+            # Evaluate the survivors in full, in order, so that ties go to the first candidate as in find_minimizer
+            coverage = coverage_probabilities(n, p[active], multinomial_confidence_interval, engine=engine)
+            evaluated_pairs += len(active) * outcomes
+            for row, value in zip(active.tolist(), coverage.tolist()):
+                if value < min_value:
+                    min_value, minimizer = value, p[row].tolist()
+
+    skipped_fraction = 1 - evaluated_pairs / total_pairs if total_pairs else 0.
+    if debug:
+        print(f"Skipped {skipped_fraction:.1%} of the (candidate, outcome) pairs")
+    return min_value, minimizer, max(skipped_fraction, 0.)
+
+
+def find_minimizer_early_exit(
+        n: int,
+        candidates: List[List[float]],
+        multinomial_confidence_interval: Callable[[List[int]], List[Tuple[float, float]]],
+        incumbent: Tuple[float, List[float]] = None,
+        tile_size: int = DEFAULT_EARLY_EXIT_TILE_SIZE,
+        max_pairs: int = DEFAULT_EARLY_EXIT_MAX_PAIRS,
+        engine: str = 'enumerate',
+        debug: bool = False
+) -> Tuple[float, List[float], float]:
+    """Same as find_minimizer_early_exit_chunks for a list or array of candidates."""
+    candidates = np.asarray(candidates, dtype=np.float64)
+    return find_minimizer_early_exit_chunks(n, [candidates], multinomial_confidence_interval, incumbent,
+                                            tile_size=tile_size, max_pairs=max_pairs, engine=engine, debug=debug)
+
+
+if __name__ == '__main__':
+    # Example usage
+    n_example = 100
+    ranked_endpoints_ = rank_endpoints(n_example, ConfidenceIntervalCalculator())
+    chunks_ = generate_unique_matrix_chunks(2, ranked_endpoints_)
+    print(find_minimizer_early_exit_chunks(n_example, chunks_, multinomial_confidence_intervals, debug=True))
@@ -1,7 +1,10 @@
-from typing import Callable, List, Tuple
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
 
 from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
-from coverage_probability.coverage_probability import coverage_probability
+from coverage_probability.coverage_probability import coverage_probability, coverage_probabilities, \
+    DEFAULT_CANDIDATE_TILE_SIZE
 
 
 def find_minimizer(
@@ -24,6 +27,55 @@ def find_minimizer(
     return min_value, minimizer
 
 
+def find_minimizer_batched(
+        n: int,
+        candidates: List[List[float]] | np.ndarray,
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        candidate_tile_size: int = DEFAULT_CANDIDATE_TILE_SIZE,
+        debug: bool = False
+) -> Tuple[float, List[float]]:
+    """
+    Finds the minimizer of the elements in the list, evaluating all candidates together with coverage_probabilities.
+
+    Returns the same (min_value, minimizer) pair as find_minimizer; ties go to the first candidate in the list.
+    """
+    if len(candidates) == 0:
+        return float('inf'), []
+
+    coverage = coverage_probabilities(n, np.asarray(candidates, dtype=np.float64), confidence_interval_function,
+                                      candidate_tile_size=candidate_tile_size)
+    if debug:
+        for p, cov_proba in zip(candidates, coverage):
+            print(p, cov_proba)
+
+    index = int(np.argmin(coverage))
+    minimizer = candidates[index]
+    return float(coverage[index]), minimizer.tolist() if isinstance(minimizer, np.ndarray) else minimizer
+
+
+def find_minimizer_chunks(
+        n: int,
+        candidate_chunks: Iterable[np.ndarray],
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        debug: bool = False
+) -> Tuple[float, List[float]]:
+    """
+    Finds the minimizer over a stream of (M, K-1) candidate chunks, such as generate_unique_matrix_chunks, so that the
+    candidate set never has to be held in memory. Ties go to the first candidate of the stream.
+    """
+    min_value, minimizer = float('inf'), []
+
+    for chunk in candidate_chunks:
+        if len(chunk) == 0:
+            continue
+
+        value, p = find_minimizer_batched(n, chunk, confidence_interval_function, debug=debug)
+        if value < min_value:
+            min_value, minimizer = value, p
+
+    return min_value, minimizer
+
+
 if __name__ == '__main__':
     # Example usage
     n_example = 10
@@ -36,3 +88,4 @@ if __name__ == '__main__':
     min_value, minimizer = find_minimizer(n_example, candidates_example, multinomial_confidence_intervals, debug=True)
     print(f"Minimum coverage probability: {min_value}")
     print(f"Minimizing candidate: {minimizer}")
+    print(find_minimizer_batched(n_example, candidates_example, multinomial_confidence_intervals))
@@ -0,0 +1,104 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.coverage_probability import coverage_probabilities
+
+# Number of candidates sent to a worker at a time; chunk boundaries depend only on this, never on the worker count
+DEFAULT_PARALLEL_CHUNK_SIZE = 4096
+
+
+def _chunk_coverage(
+        n: int,
+        chunk: np.ndarray,
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        engine: str
+) -> np.ndarray:
+    """Worker entry point: evaluates one chunk of candidates."""
+    return coverage_probabilities(n, chunk, confidence_interval_function, engine=engine)
+
+
+def parallel_coverage_probabilities(
+        n: int,
+        candidates: List[List[float]] | np.ndarray,
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        max_workers: int | None = None,
+        chunk_size: int = DEFAULT_PARALLEL_CHUNK_SIZE,
+        engine: str = 'enumerate'
+) -> np.ndarray:
+    """
+    Calculates the coverage probability of every candidate on a process pool.
+
+    The candidates are split into fixed-size chunks that are evaluated independently, and the results are
+    concatenated in chunk order, so the output is bit-identical for any number of workers.
+
+    Parameters:
+        n (int): Number of trials.
+        candidates (List[List[float]] | np.ndarray): Candidates of size K-1.
+        confidence_interval_function (Callable): Function computing the intervals of an outcome; must be picklable.
+        max_workers (int | None): Number of worker processes; None uses every core and 1 runs in-process.
+        chunk_size (int): Number of candidates per chunk.
+        engine (str): Coverage engine, see coverage_probabilities.
+
+    Returns:
+        np.ndarray: Array of shape (M,) with the coverage probability of each candidate.
+    """
+    candidates = np.asarray(candidates, dtype=np.float64)
+    chunks = [candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)]
+    if not chunks:
+        return np.empty(0, dtype=np.float64)
+
+    if max_workers == 1:
+        results = [_chunk_coverage(n, chunk, confidence_interval_function, engine) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_chunk_coverage, [n] * len(chunks), chunks,
+                                        [confidence_interval_function] * len(chunks), [engine] * len(chunks)))
+
+    return np.concatenate(results)
+
+
+def find_minimizer_parallel(
+        n: int,
+        candidates: List[List[float]] | np.ndarray,
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        max_workers: int | None = None,
+        chunk_size: int = DEFAULT_PARALLEL_CHUNK_SIZE,
+        debug: bool = False,
+        engine: str = 'enumerate'
+) -> Tuple[float, List[float]]:
+    """
+    Finds the minimizer of the elements in the list on a process pool.
+
+    Returns the same (min_value, minimizer) pair as find_minimizer; ties go to the first candidate in the list. engine
+    is passed on to the workers, see coverage_probabilities.
+    """
+    if len(candidates) == 0:
+        return float('inf'), []
+
+    coverage = parallel_coverage_probabilities(n, candidates, confidence_interval_function, max_workers, chunk_size,
+                                               engine)
+    if debug:
+        for p, cov_proba in zip(candidates, coverage):
+            print(p, cov_proba)
+
+    index = int(np.argmin(coverage))
+    minimizer = candidates[index]
+    return float(coverage[index]), minimizer.tolist() if isinstance(minimizer, np.ndarray) else minimizer
+
+
+if __name__ == '__main__':
+    # Example usage
+    n_example = 10
+    candidates_example = [
+        [0.1, 0.2, 0.3],
+        [0.2, 0.3, 0.4],
+        [0.25, 0.25, 0.25]
+    ]
+
+    min_value, minimizer = find_minimizer_parallel(n_example, candidates_example, multinomial_confidence_intervals,
+                                                   max_workers=2, chunk_size=1, debug=True)
+    print(f"Minimum coverage probability: {min_value}")
+    print(f"Minimizing candidate: {minimizer}")
@@ -0,0 +1,113 @@
+from typing import Callable, Iterator, List, Tuple
+
+import numpy as np
+
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix_chunks
+from candidate_minimizers.rank_endpoints import rank_endpoints
+from confidence_intervals.confidence_interval import BaseConfidenceIntervalCalculator, ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from coverage_probability.coverage_probability import coverage_probabilities
+from coverage_probability.multinomial_log_pmf import log_factorial_table
+from final.filter_candidates import filter_candidates
+from find_minimizer.branch_and_bound import find_minimizer_branch_and_bound
+
+# Number of endpoint indices on each side of the previous minimizer searched to seed the incumbent
+DEFAULT_SEED_RADIUS = 2
+
+
+def seed_incumbent(
+        n: int,
+        ranked_endpoints: List[float],
+        previous_minimizer: List[float],
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        condition: Callable[[List[float]], bool] = None,
+        radius: int = DEFAULT_SEED_RADIUS
+) -> Tuple[float, List[float], int] | None:
+    """
+    Evaluates the candidates of the new endpoint grid around the minimizer found for a neighbouring N.
+
+    Each coordinate of the previous minimizer is snapped to its nearest endpoint and the non-decreasing index tuples
+    within `radius` of it are evaluated exactly.
+
+    Returns:
+        Tuple[float, List[float], int] | None: The best (coverage, candidate) of the neighbourhood and the number of
+        candidates evaluated, or None when the neighbourhood holds no admissible candidate.
+    """
+    elements = np.asarray(ranked_endpoints, dtype=np.float64)
+    if len(elements) == 0 or len(previous_minimizer) == 0:
+        return None
+
+    nearest = np.clip(np.searchsorted(elements, previous_minimizer), 1, len(elements) - 1)
+    nearest -= np.asarray(previous_minimizer) - elements[nearest - 1] < elements[nearest] - previous_minimizer
+    lower = np.clip(nearest - radius, 0, len(elements) - 1)
+    upper = np.clip(nearest + radius, 0, len(elements) - 1)
+
+    chunks = list(generate_unique_matrix_chunks(len(previous_minimizer), elements, lower=lower, upper=upper))
+    candidates = np.concatenate(chunks) if chunks else np.empty((0, len(previous_minimizer)))
+    if condition and len(candidates):
+        candidates = filter_candidates(candidates, condition)
+    if len(candidates) == 0:
+        return None
+
+    coverage = coverage_probabilities(n, candidates, confidence_interval_function, engine='rectangle')
+    best = int(np.argmin(coverage))
+    return float(coverage[best]), candidates[best].tolist(), len(candidates)
+
+
+def sweep_minimizers(
+        N_values: List[int],
+        K: int,
+        confidence_interval_calculator: BaseConfidenceIntervalCalculator,
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]] = multinomial_confidence_intervals,
+        condition: Callable[[List[float]], bool] = None,
+        seed_radius: int = DEFAULT_SEED_RADIUS,
+        debug: bool = False
+) -> Iterator[Tuple[int, float, List[float], int]]:
+    """
+    Finds the minimum coverage probability for each N of an increasing sweep, sharing work between consecutive N.
+
+    The log-factorial table is built once up to max(N) and the normal quantiles are cached per alpha, so no N pays for
+    them again. The minimizer of the previous N is used to seed an incumbent on the new grid (see seed_incumbent),
+    which lets find_minimizer_branch_and_bound prune from its first box. The results are exact: the seed is a
+    candidate of the new grid, so it can only tighten the pruning.
+
+    Parameters:
+        N_values (List[int]): Sample sizes, visited in increasing order.
+        K (int): Number of categories.
+        confidence_interval_calculator (BaseConfidenceIntervalCalculator): Calculator whose endpoints define the grid.
+        confidence_interval_function (Callable): Per-count multinomial interval method.
+        condition (Callable[[List[float]], bool]): Optional filter applied to the full probability vectors.
+        seed_radius (int): Radius, in endpoint indices, of the warm-start neighbourhood.
+        debug (bool): Print progress.
+
+    Returns:
+        Iterator[Tuple[int, float, List[float], int]]: For each N, the minimum value, the minimizer and the number of
+        candidates evaluated, yielded as soon as it is known.
+    """
+    N_values = sorted(N_values)
+    if not N_values:
+        return
+    log_factorial_table(N_values[-1])
+
+    previous_minimizer: List[float] = []
+    for N in N_values:
+        ranked_endpoints = rank_endpoints(N, confidence_interval_calculator)
+        seed = seed_incumbent(N, ranked_endpoints, previous_minimizer, confidence_interval_function, condition,
+                              seed_radius)
+        incumbent, seeded = (seed[:2], seed[2]) if seed is not None else (None, 0)
+
+        min_value, minimizer, evaluated = find_minimizer_branch_and_bound(
+            N, K, ranked_endpoints, confidence_interval_function, condition, incumbent
+        )
+        if debug:
+            print(f"N = {N}: seed = {incumbent}, minimum value = {min_value}, evaluated = {seeded} + {evaluated}")
+
+        previous_minimizer = minimizer
+        yield N, min_value, minimizer, seeded + evaluated
+
+
+if __name__ == '__main__':
+    # Example usage
+    for N_, min_value_, minimizer_, evaluated_ in sweep_minimizers(list(range(20, 31)), 3,
+                                                                     ConfidenceIntervalCalculator()):
+        print(N_, min_value_, minimizer_, evaluated_)
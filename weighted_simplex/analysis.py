@@ -1,15 +1,17 @@
 import os
 import time
+from functools import partial
 from typing import Callable, List
 
 import numpy as np
 
-from candidate_minimizers.generate_unique_matrix import generate_unique_matrix
+from analysis.result_store import ResultStore, TSV_HEADER, upgrade_tsv_header
+from candidate_minimizers.generate_unique_matrix import generate_unique_matrix_chunks
 from candidate_minimizers.rank_endpoints import rank_endpoints
 from confidence_intervals.confidence_interval import ConfidenceIntervalCalculator, BaseConfidenceIntervalCalculator
-from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
+from confidence_intervals.multinomial_confidence_intervals import multinomial_method
 from final.transform_to_probability_vector import transform_to_probability_vector
-from weighted_simplex.find_minimizer import find_skewed_average_minimizer
+from weighted_simplex.find_minimizer import find_skewed_average_minimizer_chunks
 from weighted_simplex.learn_mass_function import learn_mass_function
 
 
@@ -52,7 +54,8 @@ def tsv_analysis(
         confidence_interval_function: BaseConfidenceIntervalCalculator,
         weight_function: Callable[[np.ndarray], float],
         alpha: float = 0.05,
-        debug: bool = False
+        debug: bool = False,
+        result_store: ResultStore = None
 ) -> float | None:
     confidence_interval_function_name = confidence_interval_function.__name__
     confidence_interval_function_alpha = confidence_interval_function.alpha
@@ -65,8 +68,14 @@ def tsv_analysis(
         print("Confidence Interval Function Alpha =", confidence_interval_function_alpha)
         print("Weight Function =", weight_function_name)
 
-    if check_existing_entry(file_path, N, K, confidence_interval_function_name, confidence_interval_function_alpha,
-                            weight_function_name):
+    if result_store is not None:
+        exists = result_store.exists(N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                                     weight_function_name)
+    else:
+        exists = check_existing_entry(file_path, N, K, confidence_interval_function_name,
+                                      confidence_interval_function_alpha, weight_function_name)
+
+    if exists:
         print(
             f"Entry for N={N}, K={K}, confidence_interval_function={confidence_interval_function_name}, alpha={alpha}, weight_function={weight_function_name} already exists. Skipping computation."
         )
@@ -75,14 +84,16 @@ def tsv_analysis(
     start_time = time.time()  # Start time measurement
 
     ranked_endpoints = rank_endpoints(N, confidence_interval_function)
-    candidates = generate_unique_matrix(K - 1, ranked_endpoints)
+    # Regenerated on demand, so the candidate set is never held in memory
+    candidate_chunks = partial(generate_unique_matrix_chunks, K - 1, ranked_endpoints)
     filtering_status = 'Weighted'
 
     if debug:
         print("With Filtering =", filtering_status)
 
-    min_value, minimizer = find_skewed_average_minimizer(N, candidates, multinomial_confidence_intervals,
-                                                         weight_function)
+    min_value, minimizer = find_skewed_average_minimizer_chunks(N, candidate_chunks,
+                                                                multinomial_method(confidence_interval_function, K),
+                                                                weight_function)
     end_time = time.time()  # End time measurement
     elapsed_time = end_time - start_time  # Calculate elapsed time
 
@@ -96,7 +107,14 @@ def tsv_analysis(
     risk = 1 - min_value
 
     # Prepare data as a string formatted for TSV
-    data_row = f"{N}\t{K}\t{confidence_interval_function_name}\t{confidence_interval_function_alpha}\t{weight_function_name}\t{filtering_status}\t{min_value}\t{minimizer_vector}\t{risk}\t{elapsed_time}\n"
+    data_row = f"{N}\t{K}\t{confidence_interval_function_name}\t{confidence_interval_function_alpha}\t{weight_function_name}\t{filtering_status}\t{min_value}\t{minimizer_vector}\t{risk}\t{elapsed_time}\t\n"
+
+    if result_store is not None:
+        if debug:
+            print("Writing to result store:", data_row)
+        result_store.insert(N, K, confidence_interval_function_name, confidence_interval_function_alpha,
+                            weight_function_name, filtering_status, min_value, minimizer_vector, risk, elapsed_time)
+        return risk
 
     # Write to file
     with open(file_path, 'a') as file:
@@ -114,25 +132,40 @@ def tsv_analysis_multiple(
         confidence_interval_function_values: List[BaseConfidenceIntervalCalculator],
         weight_functions: List[Callable[[np.ndarray], float]],
         alpha: float = 0.05,
-        debug: bool = False
+        debug: bool = False,
+        result_store: ResultStore = None
 ) -> List[float]:
+    """
+    Runs tsv_analysis over every combination of the parameters.
+
+    Results go to the TSV file, or, when result_store is given, to the result store, which is then exported to the TSV
+    file once all combinations are done.
+    """
     # Check if file exists and write headers if it doesn't
-    if not os.path.exists(file_path):
+    if result_store is None and not os.path.exists(file_path):
         if debug:
             print(f"{file_path} does not exist. Creating file and adding headers.")
         with open(file_path, 'w') as f:
-            f.write(
-                "N\tK\tConfidence Interval Function\tConfidence Interval Function Alpha\tCondition\tFiltering\tMinimum Value\tMinimizer\tRisk\tElapsed Time\n"
-            )
+            f.write("\t".join(TSV_HEADER) + "\n")
+    elif result_store is None:
+        # Rows are appended in the current format, so a legacy file gets its Certified Error column once, up front
+        upgrade_tsv_header(file_path)
+    elif os.path.exists(file_path):
+        # Rows already in the TSV file are skipped, and kept by the final export
+        result_store.import_tsv(file_path)
 
     risks = []
     for N in N_values:
         for K in K_values:
             for confidence_interval_function in confidence_interval_function_values:
                 for weight_function in weight_functions:
-                    risk = tsv_analysis(N, K, file_path, confidence_interval_function, weight_function, alpha, debug)
+                    risk = tsv_analysis(N, K, file_path, confidence_interval_function, weight_function, alpha, debug,
+                                        result_store)
                     if risk is not None:
                         risks.append(risk)
+
+    if result_store is not None:
+        result_store.export_tsv(file_path)
     return risks
 
 
@@ -1,10 +1,12 @@
-from typing import Callable, List, Tuple
+from typing import Callable, Iterable, List, Tuple
 
 import numpy as np
 
 from confidence_intervals.multinomial_confidence_intervals import multinomial_confidence_intervals
-from coverage_probability.coverage_probability import coverage_probability
-from final.transform_to_probability_vector import transform_to_probability_vector
+from candidate_minimizers.generate_unique_matrix import DEFAULT_CHUNK_SIZE
+from coverage_probability.coverage_probability import coverage_probabilities
+from final.transform_to_probability_vector import transform_to_probability_matrix
+from find_minimizer.parallel_find_minimizer import parallel_coverage_probabilities, DEFAULT_PARALLEL_CHUNK_SIZE
 
 
 def example_weight_function(vector: np.ndarray) -> float:
@@ -12,43 +14,174 @@ def example_weight_function(vector: np.ndarray) -> float:
     return np.sum(vector)
 
 
-def find_skewed_average_minimizer(
+example_weight_function.batch = lambda prob_matrix: np.sum(prob_matrix, axis=1)
+
+
+def weight_vector(prob_matrix: np.ndarray, weight_function: Callable[[np.ndarray], float]) -> np.ndarray:
+    """
+    Evaluates a weight function on every row of an (M, K) matrix of probability vectors.
+
+    Uses the batch counterpart of weight functions that expose one as their `batch` attribute, such as the mass
+    functions of learn_mass_function, and falls back to calling the weight function on each row otherwise.
+    """
+    batch = getattr(weight_function, 'batch', None)
+    if batch is not None:
+        return np.asarray(batch(prob_matrix), dtype=np.float64).reshape(len(prob_matrix))
+    return np.array([weight_function(vector) for vector in prob_matrix], dtype=np.float64)
+
+
+def _closest_to_average(
+        candidates: np.ndarray,
+        coverage: np.ndarray,
+        weights: np.ndarray,
+        skewed_average_cov_prob: float
+) -> List[float]:
+    """Returns the first candidate of non-zero weight whose coverage is closest to the skewed average."""
+    distance = np.where(weights != 0, np.abs(coverage - skewed_average_cov_prob), np.inf)
+    if len(distance) == 0 or not distance.min() < float('inf'):
+        return []
+    return candidates[int(np.argmin(distance))].tolist()
+
+
+def find_skewed_average_minimizer_chunks(
         n: int,
-        candidates: List[List[float]],
+        candidate_chunks: Iterable[np.ndarray] | Callable[[], Iterable[np.ndarray]],
         confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
         weight_function: Callable[[np.ndarray], float] = example_weight_function,
         debug: bool = False
 ) -> Tuple[float, List[float]]:
-    """Finds the skewed average minimizer of the elements in the list."""
+    """
+    Finds the skewed average coverage probability, the average of the coverage probabilities weighted by
+    weight_function, and the candidate whose coverage is closest to it, over a stream of (M, K-1) candidate chunks.
+
+    The chunks are streamed: the coverage of a chunk is computed by coverage_probabilities, its weights by
+    weight_vector, and the weighted sums are accumulated online. Which candidate is closest is only known once the
+    average is, so the coverage of every candidate and whether its weight is 0 are kept (9 bytes per candidate), but no
+    candidate is; the closest one is found with a single argmin, and its chunk is then produced again to return it.
+    candidate_chunks must therefore be re-iterable: a list of chunks, or a callable returning a fresh iterator in the
+    same order, such as functools.partial(generate_unique_matrix_chunks, K - 1, ranked_endpoints). Ties go to the
+    first candidate, and candidates of weight 0 are never selected.
+
+    Parameters:
+        n (int): Number of trials.
+        candidate_chunks (Iterable[np.ndarray] | Callable): Re-iterable chunks of candidates of size K-1.
+        confidence_interval_function (Callable): Function computing the intervals of an outcome.
+        weight_function (Callable[[np.ndarray], float]): Weight of a full probability vector; see weight_vector.
+        debug (bool): Print the running skewed average after each chunk.
+
+    Returns:
+        Tuple[float, List[float]]: The skewed average coverage probability and the candidate closest to it.
+    """
+    chunk_source = candidate_chunks if callable(candidate_chunks) else lambda: candidate_chunks
+    if iter(chunk_source()) is chunk_source():
+        raise ValueError("candidate_chunks is a one-shot iterator; pass a list of chunks or a callable returning one.")
+
     total_weighted_cov_prob = 0.0
     total_weight = 0.0
-    weighted_candidates = []
+    coverage_chunks, weighted_chunks = [], []
+    evaluated = 0
+    for chunk in chunk_source():
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if len(chunk) == 0:
+            continue
 
-    for p in candidates:
-        cov_proba = coverage_probability(n, p, confidence_interval_function)
-        print(transform_to_probability_vector(p))
-        weight = weight_function(np.array(transform_to_probability_vector(p)))
-        weighted_cov_proba = cov_proba * weight
-        total_weighted_cov_prob += weighted_cov_proba
-        total_weight += weight
-        weighted_candidates.append((weighted_cov_proba, weight, p))
+        coverage = coverage_probabilities(n, chunk, confidence_interval_function)
+        weights = weight_vector(transform_to_probability_matrix(chunk), weight_function)
+        total_weighted_cov_prob += float(coverage @ weights)
+        total_weight += float(weights.sum())
+        coverage_chunks.append(coverage)
+        weighted_chunks.append(weights != 0)
+        evaluated += len(chunk)
 
         if debug:
-            print(
-                f"Candidate: {p}, Coverage Probability: {cov_proba}, Weight: {weight}, Weighted Cov Proba: {weighted_cov_proba}")
+            print(f"{evaluated} candidates, skewed average = "
+                  f"{total_weighted_cov_prob / total_weight if total_weight != 0 else float('inf')}")
+
+    if evaluated == 0:
+        return float('inf'), []
 
     # Calculate the skewed average
     skewed_average_cov_prob = total_weighted_cov_prob / total_weight if total_weight != 0 else float('inf')
 
-    # Find the minimizer which is the one closest to the skewed average
-    min_value, minimizer = float('inf'), []
+    # Find the candidate closest to the skewed average, then produce its chunk again to return it
+    distance = np.where(np.concatenate(weighted_chunks),
+                        np.abs(np.concatenate(coverage_chunks) - skewed_average_cov_prob), np.inf)
+    if not distance.min() < float('inf'):
+        return skewed_average_cov_prob, []
+    index = int(np.argmin(distance))
+    for chunk in chunk_source():
+        if index < len(chunk):
+            return skewed_average_cov_prob, np.asarray(chunk, dtype=np.float64)[index].tolist()
+        index -= len(chunk)
+    raise ValueError("candidate_chunks produced fewer candidates on the second pass.")
+
+
+def find_skewed_average_minimizer(
+        n: int,
+        candidates: List[List[float]] | np.ndarray,
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        weight_function: Callable[[np.ndarray], float] = example_weight_function,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        debug: bool = False
+) -> Tuple[float, List[float]]:
+    """Same as find_skewed_average_minimizer_chunks for a list or array of candidates, split into chunk_size chunks."""
+    candidates = np.asarray(candidates, dtype=np.float64)
+    chunks = [candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)]
+    return find_skewed_average_minimizer_chunks(n, chunks, confidence_interval_function, weight_function, debug)
+
+
+def skewed_average_minimizer(
+        candidates: List[List[float]] | np.ndarray,
+        coverage: np.ndarray,
+        weight_function: Callable[[np.ndarray], float] = example_weight_function,
+        debug: bool = False
+) -> Tuple[float, List[float]]:
+    """
+    Computes the skewed average of precomputed coverage probabilities and the candidate closest to it, as in
+    find_skewed_average_minimizer.
+
+    Parameters:
+        candidates (List[List[float]] | np.ndarray): Candidates of size K-1.
+        coverage (np.ndarray): Coverage probability of each candidate.
+        weight_function (Callable[[np.ndarray], float]): Weight of a full probability vector; see weight_vector.
+        debug (bool): Print the skewed average.
+
+    Returns:
+        Tuple[float, List[float]]: The skewed average coverage probability and the candidate closest to it.
+    """
+    candidates = np.asarray(candidates, dtype=np.float64)
+    if len(candidates) == 0:
+        return float('inf'), []
 
-    for weighted_cov_proba, weight, p in weighted_candidates:
-        if abs(weighted_cov_proba / weight - skewed_average_cov_prob) < min_value:
-            min_value = abs(weighted_cov_proba / weight - skewed_average_cov_prob)
-            minimizer = p
+    coverage = np.asarray(coverage, dtype=np.float64)
+    weights = weight_vector(transform_to_probability_matrix(candidates), weight_function)
+    total_weight = float(weights.sum())
+    skewed_average_cov_prob = float(coverage @ weights) / total_weight if total_weight != 0 else float('inf')
+    if debug:
+        print(f"{len(candidates)} candidates, skewed average = {skewed_average_cov_prob}")
+
+    return skewed_average_cov_prob, _closest_to_average(candidates, coverage, weights, skewed_average_cov_prob)
+
+
+def find_skewed_average_minimizer_parallel(
+        n: int,
+        candidates: List[List[float]],
+        confidence_interval_function: Callable[[List[int]], List[Tuple[float, float]]],
+        weight_function: Callable[[np.ndarray], float] = example_weight_function,
+        max_workers: int | None = None,
+        chunk_size: int = DEFAULT_PARALLEL_CHUNK_SIZE,
+        debug: bool = False
+) -> Tuple[float, List[float]]:
+    """
+    Finds the skewed average minimizer of the elements in the list, computing the coverage probabilities on a
+    process pool.
 
-    return skewed_average_cov_prob, minimizer
+    Only the coverage probabilities are computed by the workers, so the weight function does not need to be
+    picklable. The weighted sums are then accumulated in candidate order by skewed_average_minimizer, which makes the
+    result bit-identical for any number of workers.
+    """
+    coverage = parallel_coverage_probabilities(n, candidates, confidence_interval_function, max_workers, chunk_size)
+    return skewed_average_minimizer(candidates, coverage, weight_function, debug)
 
 
 if __name__ == '__main__':
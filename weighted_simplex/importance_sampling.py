@@ -0,0 +1,149 @@
+from typing import Callable, Tuple
+
+import numpy as np
+from scipy.stats import dirichlet
+
+from confidence_intervals.confidence_interval import BaseConfidenceIntervalCalculator, ConfidenceIntervalCalculator
+from confidence_intervals.multinomial_confidence_intervals import multinomial_method
+from coverage_probability.coverage_probability import coverage_probabilities
+from weighted_simplex.find_minimizer import weight_vector
+from weighted_simplex.learn_mass_function import learn_mass_function
+
+DEFAULT_TARGET_STANDARD_ERROR = 1e-3
+
+# Number of candidates drawn and evaluated between two checks of the stopping rule
+DEFAULT_SAMPLE_BATCH_SIZE = 500
+DEFAULT_MAX_SAMPLES = 10000
+
+
+class DirichletProposal:
+    def __init__(self, concentration: np.ndarray):
+        """
+        Dirichlet proposal distribution on the simplex for importance_sampled_coverage.
+
+        Parameters:
+            concentration (np.ndarray): Positive concentration parameters, one per category.
+        """
+        self.concentration = np.asarray(concentration, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, probability_vectors: np.ndarray) -> 'DirichletProposal':
+        """
+        Fits the proposal to probability vectors by matching their means and their average variance, which places it
+        close to a mass function learned from the same vectors.
+        """
+        probability_vectors = np.asarray(probability_vectors, dtype=np.float64)
+        mean = probability_vectors.mean(axis=0)
+        variance = probability_vectors.var(axis=0)
+        # Var(p_i) = mean_i (1 - mean_i) / (precision + 1) for a Dirichlet distribution
+        precision = np.sum(mean * (1 - mean)) / max(np.sum(variance), 1e-12) - 1
+        return cls(mean * max(precision, 1e-3))
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """Draws (size, K) probability vectors."""
+        return rng.dirichlet(self.concentration, size=size)
+
+    def density(self, prob_matrix: np.ndarray) -> np.ndarray:
+        """Returns the density of the proposal at each row of an (M, K) matrix of probability vectors."""
+        # Clip away from the boundary, where scipy rejects vectors with a zero coordinate
+        prob_matrix = np.clip(np.asarray(prob_matrix, dtype=np.float64), 1e-300, None)
+        prob_matrix = prob_matrix / prob_matrix.sum(axis=1, keepdims=True)
+        return dirichlet(self.concentration).pdf(prob_matrix.T)
+
+
+def importance_sampled_coverage(
+        N: int,
+        K: int,
+        confidence_interval_function: BaseConfidenceIntervalCalculator,
+        weight_function: Callable[[np.ndarray], float],
+        proposal: DirichletProposal = None,
+        target_standard_error: float = DEFAULT_TARGET_STANDARD_ERROR,
+        batch_size: int = DEFAULT_SAMPLE_BATCH_SIZE,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+        random_state: int = 0,
+        debug: bool = False
+) -> Tuple[float, float, int]:
+    """
+    Estimates the weighted coverage probability, the integral over the simplex of the coverage probability weighted
+    by weight_function, divided by the integral of the weight, by self-normalized importance sampling.
+
+    Candidates p are drawn from the proposal and evaluated with the multinomial method of the calculator (see
+    multinomial_method), and each one is given the importance ratio r = weight(p) / density(p). The estimate is
+    sum(r C) / sum(r), and its standard error is the delta-method one, sqrt(sum(r^2 (C - estimate)^2)) / sum(r).
+    Candidates are drawn batch_size at a time until the standard error reaches target_standard_error or max_samples
+    candidates were evaluated, so the cost is a few thousand coverage evaluations whatever N and K.
+
+    Without a proposal, a weight function that can sample itself, such as a mass function of learn_mass_function
+    with n_components = K - 1, is its own proposal, and every ratio is 1; its approximate (grid_size) mode then adds a
+    bias of the order of its max_error. Any other weight function is sampled from the uniform distribution on the
+    simplex.
+
+    Unlike find_skewed_average_minimizer, which weights the candidates of the ranked-endpoint grid, this is the
+    continuous average over the simplex, so the two only agree as the grid becomes fine.
+
+    Parameters:
+        N (int): Number of trials.
+        K (int): Number of categories.
+        confidence_interval_function (BaseConfidenceIntervalCalculator): Calculator of the multinomial method.
+        weight_function (Callable[[np.ndarray], float]): Non-negative weight of a full probability vector; see
+            weight_vector.
+        proposal (DirichletProposal): Optional proposal; any object with sample(size, rng) and density(prob_matrix)
+            methods can be used, and its density only needs to be known up to a constant.
+        target_standard_error (float): Standard error at which sampling stops.
+        batch_size (int): Number of candidates drawn between two checks of the stopping rule.
+        max_samples (int): Maximum number of candidates evaluated.
+        random_state (int): Seed of the draws.
+        debug (bool): Print the estimate after each batch.
+
+    Returns:
+        Tuple[float, float, int]: The estimated weighted coverage probability, its standard error, and the number of
+        candidates evaluated.
+    """
+    rng = np.random.default_rng(random_state)
+    multinomial_confidence_interval = multinomial_method(confidence_interval_function, K)
+    self_sampling = proposal is None and hasattr(weight_function, 'sample')
+    if proposal is None and not self_sampling:
+        proposal = DirichletProposal(np.ones(K))
+
+    coverage = np.empty(0)
+    ratios = np.empty(0)
+    estimate, standard_error = float('nan'), float('inf')
+    while len(coverage) < max_samples:
+        size = min(batch_size, max_samples - len(coverage))
+        if self_sampling:
+            samples = weight_function.sample(size, rng)
+            batch_ratios = np.ones(size)
+        else:
+            samples = proposal.sample(size, rng)
+            batch_ratios = weight_vector(samples, weight_function) / proposal.density(samples)
+
+        coverage = np.concatenate([coverage, coverage_probabilities(N, samples[:, :K - 1],
+                                                                    multinomial_confidence_interval)])
+        ratios = np.concatenate([ratios, batch_ratios])
+
+        total_ratio = ratios.sum()
+        if total_ratio > 0:
+            estimate = float(ratios @ coverage / total_ratio)
+            standard_error = float(np.sqrt(np.sum((ratios * (coverage - estimate)) ** 2)) / total_ratio)
+
+        if debug:
+            effective_sample_size = total_ratio ** 2 / np.sum(ratios ** 2) if total_ratio > 0 else 0.
+            print(f"{len(coverage)} samples (effective {effective_sample_size:.0f}): "
+                  f"estimate = {estimate}, standard error = {standard_error}")
+
+        if standard_error <= target_standard_error:
+            break
+
+    return estimate, standard_error, len(coverage)
+
+
+if __name__ == '__main__':
+    # Example usage
+    vectors_ = np.random.default_rng(1).dirichlet([2., 3., 5.], size=2000)
+    mass_function_ = learn_mass_function(vectors_, n_components=2)
+    calculator_ = ConfidenceIntervalCalculator()
+
+    print(importance_sampled_coverage(100, 3, calculator_, mass_function_, debug=True))
+    print(importance_sampled_coverage(100, 3, calculator_, mass_function_, DirichletProposal.fit(vectors_),
+                                      debug=True))
+    print(importance_sampled_coverage(100, 3, calculator_, lambda vector: float(np.max(vector)), debug=True))
@@ -1,18 +1,109 @@
+import itertools
+
 import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+from scipy.signal import fftconvolve
 from scipy.stats import gaussian_kde
 from sklearn.decomposition import PCA
 
 
-def learn_mass_function(probability_vectors, n_components=None):
+# Number of training vectors on which the approximate mass function is compared with the exact KDE
+DEFAULT_ERROR_SAMPLE_SIZE = 1000
+
+# Margin added around the projected training data on the grid, in kernel standard deviations
+GRID_PADDING = 4.
+
+
+def binned_kde(
+        transformed_vectors: np.ndarray,
+        kde: gaussian_kde,
+        grid_size: int
+) -> RegularGridInterpolator:
+    """
+    Approximates a Gaussian KDE on a regular grid.
+
+    The data are spread over the grid_size^d grid points by linear binning, which keeps their total mass and their
+    mean, and the counts are convolved with the kernel of the KDE by FFT; queries are then answered by linear
+    interpolation. The grid covers the data plus GRID_PADDING kernel standard deviations on each side, and the density
+    is 0 outside of it. The kernel is sampled on the grid offsets within GRID_PADDING standard deviations along each
+    axis only, at most (2 grid_size - 1)^d values and usually far fewer, and is built from the offsets of each axis,
+    so no table of offset vectors is materialised; for the decorrelated principal components of learn_mass_function,
+    it is the product of one Gaussian per axis. Building the grid costs O(M) for the binning plus O(G^d log G^d) for
+    the convolution, and a query costs O(2^d), whatever the number M of data points.
+
+    Parameters:
+        transformed_vectors (np.ndarray): The (M, d) data the KDE was fitted on.
+        kde (gaussian_kde): The exact KDE, whose kernel covariance is reused.
+        grid_size (int): Number of grid points per dimension, at least 2.
+
+    Returns:
+        RegularGridInterpolator: Approximation of the density of the KDE, taking (Q, d) points.
+    """
+    if grid_size < 2:
+        raise ValueError("The grid needs at least 2 points per dimension.")
+
+    m, d = transformed_vectors.shape
+    padding = GRID_PADDING * np.sqrt(np.diag(kde.covariance))
+    lower = transformed_vectors.min(axis=0) - padding
+    upper = transformed_vectors.max(axis=0) + padding
+    axes = [np.linspace(lower[i], upper[i], grid_size) for i in range(d)]
+    spacing = (upper - lower) / (grid_size - 1)
+
+    # Linear binning: each point is shared between the 2^d corners of its cell
+    position = (transformed_vectors - lower) / spacing
+    base = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+    fraction = position - base
+    counts = np.zeros(grid_size ** d)
+    for corner in itertools.product((0, 1), repeat=d):
+        corner = np.array(corner)
+        weights = np.prod(np.where(corner, fraction, 1 - fraction), axis=1)
+        flat_index = np.ravel_multi_index(tuple((base + corner).T), (grid_size,) * d)
+        counts += np.bincount(flat_index, weights=weights, minlength=grid_size ** d)
+    counts = counts.reshape((grid_size,) * d)
+
+    # Kernel truncated at GRID_PADDING standard deviations per axis. Each axis holds its own offsets, shaped to
+    # broadcast along that axis, and the quadratic form is summed term by term; the cross terms vanish for
+    # decorrelated axes, which leaves a product of one Gaussian per axis
+    half_width = np.minimum(np.ceil(padding / spacing).astype(np.int64), grid_size - 1)
+    offsets = [(np.arange(-half_width[i], half_width[i] + 1) * spacing[i]).reshape((-1,) + (1,) * (d - 1 - i))
+               for i in range(d)]
+    precision = np.linalg.inv(kde.covariance)
+    exponent = sum(precision[i, i] * offsets[i] ** 2 for i in range(d))
+    for i, j in itertools.combinations(range(d), 2):
+        if precision[i, j] != 0:
+            exponent = exponent + 2 * precision[i, j] * offsets[i] * offsets[j]
+    kernel = np.exp(-exponent / 2) / np.sqrt((2 * np.pi) ** d * np.linalg.det(kde.covariance))
+
+    density = np.maximum(fftconvolve(counts, kernel, mode='same'), 0.) / m
+    return RegularGridInterpolator(axes, density, method='linear', bounds_error=False, fill_value=0.)
+
+
+def learn_mass_function(
+        probability_vectors,
+        n_components=None,
+        grid_size=None,
+        error_sample_size=DEFAULT_ERROR_SAMPLE_SIZE,
+        random_state=0
+):
     """
     Learns a continuous mass function defined on the simplex based on the given probability vectors.
 
     Parameters:
     probability_vectors (array-like): List or array of probability vectors.
     n_components (int, optional): Number of principal components to keep. If None, keep all components.
+    grid_size (int, optional): If given, the KDE is approximated on a grid of grid_size points per principal
+        component (see binned_kde), so that querying no longer scales with the number of probability vectors.
+    error_sample_size (int): With grid_size, number of probability vectors, drawn at random, on which the
+        approximation is compared with the exact KDE; 0 skips the comparison.
+    random_state (int): Seed of the draw of the comparison sample.
 
     Returns:
-    function: A mass function that takes a probability vector and returns its mass.
+    function: A mass function that takes a probability vector and returns its mass. Its `batch` attribute takes an
+    (M, K) array of probability vectors and returns the (M,) masses in one PCA transform and one KDE evaluation. When
+    n_components is K - 1, its `sample(size, rng)` attribute draws (size, K) probability vectors from the exact KDE
+    restricted to the simplex, whose density is proportional to the mass there. With
+    grid_size, its `max_error` attribute is the largest absolute difference between its masses and those of the exact
+    KDE, normalized the same way, on the comparison sample (None if skipped).
     """
     # Ensure input is a numpy array
     probability_vectors = np.asarray(probability_vectors)
@@ -24,15 +115,48 @@ def learn_mass_function(probability_vectors, n_components=None):
     # Kernel Density Estimation on the transformed data
     kde = gaussian_kde(transformed_vectors.T)
 
+    if grid_size is None:
+        density = lambda points: kde(points.T)
+    else:
+        interpolator = binned_kde(transformed_vectors, kde, grid_size)
+        density = lambda points: interpolator(points)
+
     # Estimate the maximum density for normalization
-    density_estimates = kde(transformed_vectors.T)
+    density_estimates = density(transformed_vectors)
     max_density = np.max(density_estimates)
 
     # Define the mass function
     def mass_function(vector: np.ndarray) -> float:
         vector = np.asarray(vector)
         transformed_vector = pca.transform([vector])
-        return kde(transformed_vector.T)[0] / max_density
+        return density(transformed_vector)[0] / max_density
+
+    def mass_function_batch(prob_matrix: np.ndarray) -> np.ndarray:
+        transformed_vectors_ = pca.transform(np.asarray(prob_matrix, dtype=np.float64))
+        return density(transformed_vectors_) / max_density
+
+    mass_function.batch = mass_function_batch
+
+    if pca.n_components_ == probability_vectors.shape[1] - 1:
+        # The PCA is then a bijective affine map of the simplex, so the KDE is a density on the simplex
+        def sample(size: int, rng: np.random.Generator) -> np.ndarray:
+            samples = np.empty((0, probability_vectors.shape[1]))
+            while len(samples) < size:
+                drawn = pca.inverse_transform(kde.resample(size, seed=rng).T)
+                drawn = drawn[np.all(drawn >= 0, axis=1)]
+                samples = np.concatenate([samples, drawn / drawn.sum(axis=1, keepdims=True)])
+            return samples[:size]
+
+        mass_function.sample = sample
+
+    if grid_size is not None:
+        mass_function.max_error = None
+        if error_sample_size:
+            rng = np.random.default_rng(random_state)
+            sample = rng.choice(len(transformed_vectors), min(error_sample_size, len(transformed_vectors)),
+                                replace=False)
+            exact = kde(transformed_vectors[sample].T)
+            mass_function.max_error = float(np.max(np.abs(density_estimates[sample] - exact)) / max_density)
 
     return mass_function
 
@@ -67,3 +191,11 @@ if __name__ == "__main__":
         mass = mass_function(test_vector)
         print(f"Test Vector {i + 1}: {test_vector}")
         print(f"Normalized Mass: {mass}\n")
+
+    print(f"Batch masses: {mass_function.batch(np.array(test_vectors))}")
+
+    # Approximate mass function, fitted on a large sample
+    large_sample = np.random.default_rng(0).dirichlet([2., 3., 5.], size=200000)
+    approximate_mass_function = learn_mass_function(large_sample, n_components=2, grid_size=256)
+    print(f"Approximate masses: {approximate_mass_function.batch(np.array(test_vectors))}")
+    print(f"Max error against the exact KDE: {approximate_mass_function.max_error}")